@@ -0,0 +1 @@
+"""Benchmarks of the SDK against offline transports, run with `python -m benchmarks`."""
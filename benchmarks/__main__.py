@@ -0,0 +1,56 @@
+import argparse
+import json
+import sys
+
+from benchmarks.harness import DEFAULT_REPEAT, DEFAULT_TOLERANCE, load_benchmarks, measure, regressions
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Measure the throughput and peak memory of the SDK against offline transports.',
+    )
+    parser.add_argument('names', nargs='*', help='benchmarks to run, all by default')
+    parser.add_argument('--scale', type=float, default=1, help='multiplies the size of every benchmark')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='timed runs per benchmark')
+    parser.add_argument('--save', help='write the results to this JSON file, e.g. as a baseline')
+    parser.add_argument('--compare', help='JSON file of baseline results the results are checked against')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed relative regression compared to the baseline (default: %(default)s)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    benchmarks = load_benchmarks()
+    names = args.names or sorted(benchmarks)
+    unknown = [name for name in names if name not in benchmarks]
+    if unknown:
+        print(f"Unknown benchmarks: {', '.join(unknown)}. Available: {', '.join(sorted(benchmarks))}", file=sys.stderr)
+        return 2
+
+    baselines = {}
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baselines = {result['name']: result for result in json.load(baseline_file)}
+
+    results = []
+    failed = False
+    print(f"{'benchmark':<32} {'seconds':>9} {'throughput':>22} {'peak MiB':>9}")
+    for name in names:
+        result = measure(benchmarks[name], scale=args.scale, repeat=args.repeat)
+        results.append(result)
+        throughput = f"{result['throughput']:.0f} {result['unit']}/s"
+        print(f"{name:<32} {result['seconds']:>9.4f} {throughput:>22} {result['peak_mib']:>9.2f}")
+        for message in regressions(result, baselines.get(name), args.tolerance):
+            failed = True
+            print(f"  REGRESSION: {message}")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as results_file:
+            json.dump(results, results_file, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,46 @@
+import json
+from datetime import timedelta
+
+from benchmarks.harness import benchmark, scaled
+from ieasyhydro_sdk.sdk import IEasyHydroHFSDK
+from ieasyhydro_sdk.transport import SyntheticHFTransport, TransportResponse
+
+
+def _data_values_page(scale):
+    """Body of one data value page of a year of 6-hourly values, as sent by the server."""
+    transport = SyntheticHFTransport(station_count=scaled(20, scale), step=timedelta(hours=6))
+    url = f'http://synthetic.test/api/v1/sdk-data-values/{transport.organization_uuid}'
+    response = transport.request('get', url, params={
+        'page_size': scaled(20, scale),
+        'timestamp__gte': '2020-01-01T00:00:00Z',
+        'timestamp__lt': '2021-01-01T00:00:00Z',
+    })
+    return response.content
+
+
+@benchmark('KiB', max_peak_mib=40)
+def decode_data_values(scale):
+    """The SDK decoder, orjson when it is installed."""
+    sdk = IEasyHydroHFSDK(
+        host='http://synthetic.test/api/v1/', username='benchmark', password='benchmark',
+        transport=SyntheticHFTransport(station_count=1),
+    )
+    content = _data_values_page(scale)
+
+    def run():
+        sdk._response_json(TransportResponse(200, content))
+        return len(content) // 1024
+
+    return run
+
+
+@benchmark('KiB', max_peak_mib=40)
+def decode_data_values_stdlib(scale):
+    """The standard library decoder, what the SDK decodes with without orjson."""
+    content = _data_values_page(scale)
+
+    def run():
+        json.loads(content)
+        return len(content) // 1024
+
+    return run
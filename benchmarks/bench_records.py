@@ -0,0 +1,25 @@
+from benchmarks.harness import benchmark, scaled
+from ieasyhydro_sdk.sdk import IEasyHydroHFSDK
+from ieasyhydro_sdk.transport import SyntheticHFTransport
+
+
+def _sdk(scale):
+    sdk = IEasyHydroHFSDK(
+        host='http://synthetic.test/api/v1/', username='benchmark', password='benchmark',
+        transport=SyntheticHFTransport(station_count=scaled(5000, scale)),
+    )
+    # the listing is fetched and mapped once, the runs measure the returned sites
+    sdk.get_discharge_sites()
+    return sdk
+
+
+@benchmark('sites', max_peak_mib=8)
+def sites_as_dicts(scale):
+    sdk = _sdk(scale)
+    return lambda: len(sdk.get_discharge_sites())
+
+
+@benchmark('sites', max_peak_mib=4)
+def sites_as_records(scale):
+    sdk = _sdk(scale)
+    return lambda: len(sdk.get_discharge_sites(as_records=True))
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from benchmarks.harness import benchmark, scaled
+from ieasyhydro_sdk.sdk import IEasyHydroHFSDK
+from ieasyhydro_sdk.transport import SyntheticHFTransport
+
+
+DATA_VALUE_FILTERS = {
+    'variable_names': ['WDD', 'WLD'],
+    'utc_date_time__gte': '2020-01-01T00:00:00Z',
+    'utc_date_time__lt': '2021-01-01T00:00:00Z',
+}
+
+
+def _sdk(transport):
+    return IEasyHydroHFSDK(
+        host='http://synthetic.test/api/v1/', username='benchmark', password='benchmark', transport=transport
+    )
+
+
+def _data_values_sdk(scale):
+    transport = SyntheticHFTransport(
+        station_count=scaled(20, scale), step=timedelta(hours=6), page_size=5,
+    )
+    filters = dict(DATA_VALUE_FILTERS, site_codes=[station['station_code'] for station in transport.stations['hydrological']])
+    return _sdk(transport), filters
+
+
+def _count_values(response):
+    return sum(
+        len(variable_data['values'])
+        for station in response['results']
+        for variable_data in station['data']
+    )
+
+
+@benchmark('sites', max_peak_mib=20)
+def get_discharge_sites(scale):
+    sdk = _sdk(SyntheticHFTransport(station_count=scaled(2000, scale)))
+
+    def run():
+        # measures fetching and mapping, not the site catalog
+        sdk.invalidate_site_catalog()
+        return len(sdk.get_discharge_sites())
+
+    return run
+
+
+@benchmark('norms', max_peak_mib=5)
+def get_norms_for_sites(scale):
+    transport = SyntheticHFTransport(station_count=scaled(200, scale))
+    sdk = _sdk(transport)
+    site_codes = [station['station_code'] for station in transport.stations['hydrological']]
+
+    def run():
+        norms = sdk.get_norms_for_sites(site_codes, ['discharge'])
+        return sum(norm['discharge']['norm_data'] is not None for norm in norms.values())
+
+    return run
+
+
+@benchmark('values', max_peak_mib=45)
+def get_data_values_all_pages(scale):
+    sdk, filters = _data_values_sdk(scale)
+    return lambda: _count_values(sdk.get_data_values_for_site(filters, all_pages=True))
+
+
+@benchmark('values', max_peak_mib=45)
+def get_data_values_sharded(scale):
+    sdk, filters = _data_values_sdk(scale)
+    return lambda: _count_values(sdk.get_data_values_for_site(filters, shard='month'))
+
+
+@benchmark('values', max_peak_mib=45)
+def get_data_values_columnar(scale):
+    sdk, filters = _data_values_sdk(scale)
+    return lambda: sum(len(series) for series in sdk.get_data_values_for_site(filters, all_pages=True, columnar=True))
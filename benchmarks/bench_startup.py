@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+
+from benchmarks.harness import benchmark, scaled
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules only imported when they are used, see the lazy loading of the SDK
+DEFERRED_MODULES = ('requests', 'urllib3', 'numpy', 'httpx')
+
+IMPORT_SCRIPT = '''
+import sys
+from ieasyhydro_sdk.sdk import IEasyHydroHFSDK, IEasyHydroSDK
+
+IEasyHydroHFSDK(host='http://synthetic.test/api/v1/', username='benchmark', password='benchmark')
+IEasyHydroSDK(host='http://synthetic.test', username='benchmark', password='benchmark')
+print(','.join(name for name in {deferred!r} if name in sys.modules))
+'''
+
+COLD_START_SCRIPT = '''
+from ieasyhydro_sdk.sdk import IEasyHydroHFSDK
+from ieasyhydro_sdk.transport import SyntheticHFTransport
+
+sdk = IEasyHydroHFSDK(
+    host='http://synthetic.test/api/v1/', username='benchmark', password='benchmark',
+    transport=SyntheticHFTransport(station_count=10),
+)
+print(len(sdk.get_discharge_sites()))
+'''
+
+
+def _run_script(script):
+    completed = subprocess.run(
+        [sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return completed.stdout.strip()
+
+
+@benchmark('processes')
+def import_and_create_clients(scale):
+    """Start a process importing the SDK and creating both clients, which must not import the
+    deferred modules."""
+    script = IMPORT_SCRIPT.format(deferred=DEFERRED_MODULES)
+    processes = scaled(5, scale)
+
+    def run():
+        for _ in range(processes):
+            imported = _run_script(script)
+            if imported:
+                raise AssertionError(f'creating the clients imported {imported}')
+        return processes
+
+    return run
+
+
+@benchmark('processes')
+def cold_start_first_request(scale):
+    """Start a process importing the SDK, logging in and listing sites."""
+    processes = scaled(5, scale)
+
+    def run():
+        for _ in range(processes):
+            _run_script(COLD_START_SCRIPT)
+        return processes
+
+    return run
@@ -0,0 +1,78 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.harness import benchmark, scaled
+from ieasyhydro_sdk.sdk import IEasyHydroHFSDK
+from ieasyhydro_sdk.transport import SessionTransport
+
+
+CONCURRENT_REQUESTS = 8
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # keep-alive, so pooled connections are reused; without TCP_NODELAY the separately written
+    # headers and body of a response wait for delayed ACKs on reused connections
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def _respond(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        if self.path.endswith('auth/token-obtain'):
+            data = {'access': 'stub', 'refresh': 'stub', 'user': {'organization': {'uuid': 'stub'}}}
+        else:
+            data = {'results': []}
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_address[1]}/api/v1/'
+
+
+class _UnpooledTransport(SessionTransport):
+    """Opens a new connection for every request, the SDK behaviour without a shared session."""
+
+    def request(self, method, url, headers=None, json=None, params=None, timeout=None):
+        import requests
+
+        return requests.request(method, url, headers=headers, json=json, params=params, timeout=timeout)
+
+
+def _requests_per_second(transport, scale):
+    sdk = IEasyHydroHFSDK(host=_start_stub_server(), username='benchmark', password='benchmark', transport=transport)
+    request_count = scaled(400, scale)
+
+    def run():
+        with ThreadPoolExecutor(max_workers=CONCURRENT_REQUESTS) as executor:
+            responses = list(executor.map(
+                lambda _: sdk._call_api('get', 'ping', paginated_endpoint=False), range(request_count)
+            ))
+        return sum(response.status_code == 200 for response in responses)
+
+    return run
+
+
+@benchmark('requests', max_peak_mib=10)
+def session_pooled(scale):
+    return _requests_per_second(SessionTransport(pool_size=CONCURRENT_REQUESTS), scale)
+
+
+@benchmark('requests', max_peak_mib=20)
+def session_unpooled(scale):
+    return _requests_per_second(_UnpooledTransport(), scale)
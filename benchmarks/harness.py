@@ -0,0 +1,114 @@
+import importlib
+import pkgutil
+import time
+import tracemalloc
+
+
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25
+# smaller peak memory differences are noise, e.g. of benchmarks running subprocesses
+MIN_PEAK_REGRESSION_MIB = 1.0
+
+BENCHMARKS = {}
+
+
+class Benchmark:
+    """A registered benchmark.
+
+    Args:
+        name: Name of the benchmark
+        setup: Callable taking the scale and returning the measured callable, which returns
+            the number of processed items
+        unit: Name of the processed items, e.g. 'values'
+        max_peak_mib: Peak traced memory in MiB the benchmark must stay below at scale 1
+    """
+
+    def __init__(self, name, setup, unit, max_peak_mib=None):
+        self.name = name
+        self.setup = setup
+        self.unit = unit
+        self.max_peak_mib = max_peak_mib
+
+
+def benchmark(unit, max_peak_mib=None):
+    """Register the decorated setup function as a benchmark named after the function."""
+    def register(setup):
+        BENCHMARKS[setup.__name__] = Benchmark(setup.__name__, setup, unit, max_peak_mib)
+        return setup
+
+    return register
+
+
+def scaled(count, scale):
+    """Return count multiplied by the benchmark scale, at least 1."""
+    return max(1, int(count * scale))
+
+
+def load_benchmarks():
+    """Import all `bench_*` modules of the package, which register their benchmarks."""
+    import benchmarks
+
+    for module in pkgutil.iter_modules(benchmarks.__path__):
+        if module.name.startswith('bench_'):
+            importlib.import_module(f'benchmarks.{module.name}')
+    return BENCHMARKS
+
+
+def measure(benchmark_, scale=1, repeat=DEFAULT_REPEAT):
+    """Run a benchmark and return its fastest time, throughput and peak traced memory.
+
+    The measured callable runs once as a warm-up, `repeat` times timed and once more with
+    tracemalloc, so tracing does not slow down the timed runs.
+    """
+    run = benchmark_.setup(scale)
+    run()
+
+    seconds = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        items = run()
+        seconds.append(time.perf_counter() - started_at)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    fastest = min(seconds)
+    return {
+        'name': benchmark_.name,
+        'scale': scale,
+        'items': items,
+        'unit': benchmark_.unit,
+        'seconds': fastest,
+        'throughput': items / fastest if fastest else float('inf'),
+        'peak_mib': peak / 2 ** 20,
+    }
+
+
+def regressions(result, baseline=None, tolerance=DEFAULT_TOLERANCE):
+    """Return the messages of the expectations a result misses.
+
+    A result regresses when it exceeds the `max_peak_mib` of its benchmark, or, compared to a
+    baseline result of the same scale, when its throughput is lower or its peak memory higher
+    by more than `tolerance` (and at least `MIN_PEAK_REGRESSION_MIB`).
+    """
+    messages = []
+    max_peak_mib = BENCHMARKS[result['name']].max_peak_mib
+    if max_peak_mib is not None and result['scale'] == 1 and result['peak_mib'] > max_peak_mib:
+        messages.append(f"peak memory {result['peak_mib']:.1f} MiB exceeds {max_peak_mib} MiB")
+
+    if baseline is not None and baseline['scale'] == result['scale']:
+        if result['throughput'] < baseline['throughput'] * (1 - tolerance):
+            messages.append(
+                f"throughput {result['throughput']:.0f} {result['unit']}/s is below the baseline "
+                f"{baseline['throughput']:.0f} {result['unit']}/s"
+            )
+        peak_limit = max(baseline['peak_mib'] * (1 + tolerance), baseline['peak_mib'] + MIN_PEAK_REGRESSION_MIB)
+        if result['peak_mib'] > peak_limit:
+            messages.append(
+                f"peak memory {result['peak_mib']:.1f} MiB is above the baseline {baseline['peak_mib']:.1f} MiB"
+            )
+    return messages
@@ -0,0 +1,222 @@
+import asyncio
+from urllib.parse import urljoin
+
+from ieasyhydro_sdk.sdk import IEasyHydroHFSDK
+from ieasyhydro_sdk.sdk_base import DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT, IEasyHydroHFSDKBase
+from ieasyhydro_sdk.sdk_endpoint_definitions import IEasyHydroHFSDKEndpointsBase
+from ieasyhydro_sdk.filters import GetHFDataValuesFilters
+from ieasyhydro_sdk.instrumentation import logger
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+
+DEFAULT_MAX_CONCURRENCY = 10
+
+
+class AsyncIEasyHydroHFSDK:
+    """asyncio variant of `IEasyHydroHFSDK`.
+
+    All requests go through one pooled `httpx.AsyncClient` and at most
+    `max_concurrency` of them are in flight at the same time, so hundreds of
+    station queries can be gathered without exhausting the server or the pool.
+    Requires the optional `httpx` dependency (`pip install ieasyhydro_sdk[async]`).
+
+    Args:
+        transport: Optional `httpx.AsyncBaseTransport`, e.g. an `httpx.MockTransport` in tests
+    """
+
+    # mapping helpers are shared with the synchronous SDK so both return the same data
+    _resolve_station_type = staticmethod(IEasyHydroHFSDK._resolve_station_type)
+    _resolve_forecast_status = staticmethod(IEasyHydroHFSDK._resolve_forecast_status)
+    map_site_data = IEasyHydroHFSDK.map_site_data
+    _map_filters = IEasyHydroHFSDKEndpointsBase._map_filters
+    _ensure_norm_data_has_correct_length = IEasyHydroHFSDKEndpointsBase._ensure_norm_data_has_correct_length
+    # the connection settings are read from the same environment variables
+    environment_prefix = IEasyHydroHFSDKBase.environment_prefix
+    default_host = IEasyHydroHFSDKBase.default_host
+    _configure_credentials = IEasyHydroHFSDKBase._configure_credentials
+
+    def __init__(
+            self,
+            host=None,
+            username=None,
+            password=None,
+            organization_id=None,
+            pool_size=DEFAULT_POOL_SIZE,
+            timeout=DEFAULT_TIMEOUT,
+            max_concurrency=DEFAULT_MAX_CONCURRENCY,
+            transport=None,
+    ):
+        if httpx is None:
+            raise ImportError(
+                'AsyncIEasyHydroHFSDK requires the "httpx" package. '
+                'Install it with "pip install ieasyhydro_sdk[async]".')
+
+        self._configure_credentials(host, username, password, organization_id)
+        self.organization_uuid = None
+        self.bearer_token = None
+
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=timeout,
+            transport=transport,
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._login_lock = asyncio.Lock()
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _login(self):
+        response = await self.client.post(
+            urljoin(self.host, 'auth/token-obtain'),
+            json={'username': self.username, 'password': self.password},
+        )
+        if response.status_code == 200:
+            response_json = response.json()
+            self.bearer_token = response_json["access"]
+            self.organization_uuid = response_json["user"]["organization"]["uuid"]
+        else:
+            raise ValueError('Configured username and password are not valid.')
+
+    async def _ensure_logged_in(self):
+        # concurrent first calls wait for a single login instead of each logging in
+        if self.bearer_token:
+            return
+        async with self._login_lock:
+            if not self.bearer_token:
+                await self._login()
+
+    async def _call_api(self, method, relative_url, params=None):
+        await self._ensure_logged_in()
+
+        if relative_url is None:
+            raise ValueError('No path provided or the provided path is None')
+
+        headers = {'Authorization': f'Bearer {self.bearer_token}'}
+        if self.organization_id:
+            headers['organization'] = str(self.organization_id)
+
+        # requests silently drops None params, httpx would send them as empty strings
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+
+        async with self._semaphore:
+            return await self.client.request(
+                method,
+                urljoin(self.host, relative_url),
+                headers=headers,
+                params=params,
+            )
+
+    async def _get_sites(self, site_type, description):
+        await self._ensure_logged_in()
+        sites_response = await self._call_api('get', f'stations/{self.organization_uuid}/{site_type}')
+        if sites_response.status_code == 200:
+            return self.map_site_data(sites_response.json())
+        else:
+            raise ValueError(f"Could not retrieve {description} sites, got status code {sites_response.status_code}")
+
+    async def get_discharge_sites(self):
+        return await self._get_sites('hydrological', 'discharge')
+
+    async def get_meteo_sites(self):
+        return await self._get_sites('meteo', 'meteo')
+
+    async def get_virtual_sites(self):
+        return await self._get_sites('virtual', 'virtual')
+
+    async def _get_site_uuid_for_site_code(self, site_code, site_type, station_type="M"):
+        await self._ensure_logged_in()
+        site_types = {
+            'hydro': 'hydrological',
+            'meteo': 'meteo',
+            'virtual': 'virtual',
+        }
+        if site_type not in site_types:
+            return None
+
+        params = {'station_code': site_code}
+        if station_type:
+            params['station_type'] = station_type
+
+        site_response = await self._call_api(
+            'get', f'stations/{self.organization_uuid}/{site_types[site_type]}', params=params
+        )
+        if site_response.status_code == 200:
+            sites = site_response.json()
+            for site in sites:
+                if site.get('station_type') == station_type:
+                    return site.get('uuid')
+            if sites:
+                logger.warning('No site found with station_type=%s, using first available site', station_type)
+                return sites[0].get('uuid')
+        return None
+
+    async def get_norm_for_site(self, site_code, norm_type, norm_period="d", automatic=False):
+        """
+        Get norm data for a site, see `IEasyHydroHFSDK.get_norm_for_site`.
+        """
+        station_type = 'A' if automatic else 'M'
+
+        match norm_type:
+            case 'discharge':
+                site_type, path_prefix = 'hydro', 'hydrological-norms'
+                params = {"norm_type": norm_period, "metric": "discharge"}
+            case 'water_level':
+                site_type, path_prefix = 'hydro', 'hydrological-norms'
+                params = {"norm_type": norm_period, "metric": "water_level"}
+            case 'precipitation':
+                site_type, path_prefix = 'meteo', 'meteorological-norms'
+                params = {"norm_type": norm_period, "norm_metric": "p"}
+            case 'temperature':
+                site_type, path_prefix = 'meteo', 'meteorological-norms'
+                params = {"norm_type": norm_period, "norm_metric": "t"}
+            case _:
+                raise ValueError(f"Can only retrieve discharge, water level, precipitation or temperature norms, got {norm_type}")
+
+        site_uuid = await self._get_site_uuid_for_site_code(site_code, site_type, station_type)
+        path = f'{path_prefix}/{site_uuid}' if site_uuid else None
+        norm_response = await self._call_api('get', path, params=params)
+
+        if norm_response.status_code == 200:
+            return self._ensure_norm_data_has_correct_length(
+                [float(entry["value"]) for entry in norm_response.json()],
+                norm_period
+            )
+        else:
+            raise ValueError(
+                f"Could not retrieve {norm_type} norm for site {site_code}, got status code {norm_response.status_code}"
+            )
+
+    async def get_data_values_for_site(self, filters: GetHFDataValuesFilters = None):
+        if not filters:
+            raise ValueError("Filters are required")
+
+        await self._ensure_logged_in()
+        filters = {
+            'view_type': 'measurements',
+            'display_type': 'individual',
+            **filters
+        }
+        api_filters = self._map_filters(filters)
+        response = await self._call_api(
+            'get', f'sdk-data-values/{self.organization_uuid}', params=api_filters
+        )
+        if response.status_code != 200:
+            return {
+                'status_code': response.status_code,
+                'text': response.text
+            }
+
+        return response.json()
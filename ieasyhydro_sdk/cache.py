@@ -0,0 +1,214 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+
+# filter name -> (cache column, SQL operator)
+TIME_FILTERS = {
+    'utc_date_time': ('utc_ts', '='),
+    'utc_date_time__gt': ('utc_ts', '>'),
+    'utc_date_time__gte': ('utc_ts', '>='),
+    'utc_date_time__lt': ('utc_ts', '<'),
+    'utc_date_time__lte': ('utc_ts', '<='),
+    'local_date_time': ('local_ts', '='),
+    'local_date_time__gt': ('local_ts', '>'),
+    'local_date_time__gte': ('local_ts', '>='),
+    'local_date_time__lt': ('local_ts', '<'),
+    'local_date_time__lte': ('local_ts', '<='),
+}
+
+# local time is at most this far from UTC, used to turn local time bounds into UTC ones
+MAX_UTC_OFFSET = timedelta(hours=14).total_seconds()
+
+
+def utc_datetime(timestamp):
+    """Convert epoch seconds to a naive UTC datetime."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+def to_timestamp(value):
+    """Convert a filter or API timestamp (epoch, datetime or ISO string) to epoch seconds.
+
+    Naive values are interpreted as UTC.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class DataValuesCache:
+    """On-disk SQLite store of data value series, keyed by site code and variable.
+
+    The SDKs use it to only request values newer than the latest cached one (and values
+    older than the cached range when an earlier start is requested) and to serve the
+    requested window from disk.
+
+    Args:
+        path: Path of the SQLite database file, created if it does not exist
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS series ('
+                'namespace TEXT, site_code TEXT, variable TEXT, synced_from REAL, metadata TEXT, '
+                'PRIMARY KEY (namespace, site_code, variable))'
+            )
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS data_values ('
+                'namespace TEXT, site_code TEXT, variable TEXT, utc_ts REAL, local_ts REAL, payload TEXT, '
+                'PRIMARY KEY (namespace, site_code, variable, utc_ts))'
+            )
+
+    def close(self):
+        self._connection.close()
+
+    def get_series(self, namespace, site_code, variable):
+        """Return the synced state of a series or None if it was never synced."""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT synced_from, metadata, '
+                '(SELECT MAX(utc_ts) FROM data_values v WHERE v.namespace = s.namespace '
+                'AND v.site_code = s.site_code AND v.variable = s.variable) '
+                'FROM series s WHERE namespace = ? AND site_code = ? AND variable = ?',
+                (namespace, site_code, variable),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            'synced_from': row[0],
+            'metadata': json.loads(row[1]) if row[1] else None,
+            'latest': row[2],
+        }
+
+    def store(self, namespace, site_code, variable, rows, synced_from, metadata=None):
+        """Insert (utc_ts, local_ts, payload) rows, replacing rows with the same UTC timestamp.
+
+        Metadata is only replaced when provided.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT INTO series (namespace, site_code, variable, synced_from, metadata) '
+                'VALUES (?, ?, ?, ?, ?) ON CONFLICT (namespace, site_code, variable) DO UPDATE SET '
+                'synced_from = excluded.synced_from, metadata = COALESCE(excluded.metadata, series.metadata)',
+                (namespace, site_code, variable, synced_from, json.dumps(metadata) if metadata else None),
+            )
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO data_values (namespace, site_code, variable, utc_ts, local_ts, payload) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (
+                    (namespace, site_code, variable, utc_ts, local_ts, json.dumps(payload))
+                    for utc_ts, local_ts, payload in rows
+                ),
+            )
+
+    def load(self, namespace, site_code, variable, time_filters=None):
+        """Return the cached payloads of a series within the time filters, oldest first."""
+        conditions = ['namespace = ?', 'site_code = ?', 'variable = ?']
+        arguments = [namespace, site_code, variable]
+        for name, value in (time_filters or {}).items():
+            column, operator = TIME_FILTERS[name]
+            conditions.append(f'{column} {operator} ?')
+            arguments.append(to_timestamp(value))
+
+        with self._lock:
+            rows = self._connection.execute(
+                f'SELECT payload FROM data_values WHERE {" AND ".join(conditions)} ORDER BY utc_ts',
+                arguments,
+            ).fetchall()
+
+        return [json.loads(row[0]) for row in rows]
+
+    def sync(self, namespace, site_code, variable, filters, fetch, to_filter_value):
+        """Bring a series up to date for the requested time filters and return it from the cache.
+
+        Args:
+            namespace: Separates series of different servers and organizations
+            site_code: Site code of the series
+            variable: Variable of the series
+            filters: Time filters of the request (keys of `TIME_FILTERS`)
+            fetch: Callable taking time filters and returning (rows, metadata) fetched from the API
+            to_filter_value: Converts epoch seconds to a filter value accepted by the API
+
+        Returns:
+            Tuple of the cached payloads within the filters and the series metadata
+        """
+        time_filters = {name: value for name, value in filters.items() if name in TIME_FILTERS}
+        lower_filters, upper_filters = {}, {}
+        for name, value in time_filters.items():
+            if name in ('utc_date_time', 'local_date_time'):
+                lower_filters[f'{name}__gte'] = value
+                upper_filters[f'{name}__lte'] = value
+            elif name.endswith(('__gt', '__gte')):
+                lower_filters[name] = value
+            else:
+                upper_filters[name] = value
+
+        series = self.get_series(namespace, site_code, variable)
+        metadata = series['metadata'] if series else None
+
+        if series is None:
+            rows, metadata = fetch(time_filters)
+            self.store(namespace, site_code, variable, rows, self._covered_from(lower_filters), metadata)
+            return self.load(namespace, site_code, variable, time_filters), metadata
+
+        synced_from = series['synced_from']
+        requested_from = self._requested_from(lower_filters)
+        if synced_from is not None and (requested_from is None or requested_from < synced_from):
+            # fill the gap before the cached range
+            rows, gap_metadata = fetch({**lower_filters, 'utc_date_time__lt': to_filter_value(synced_from)})
+            covered_from = self._covered_from(lower_filters)
+            synced_from = None if covered_from is None else min(covered_from, synced_from)
+            metadata = gap_metadata or metadata
+            self.store(namespace, site_code, variable, rows, synced_from, gap_metadata)
+
+        latest = series['latest']
+        requested_until = self._requested_until(upper_filters)
+        if latest is None or requested_until is None or requested_until > latest:
+            delta_filters = dict(upper_filters)
+            if latest is not None:
+                delta_filters['utc_date_time__gt'] = to_filter_value(latest)
+            elif synced_from is not None:
+                delta_filters['utc_date_time__gte'] = to_filter_value(synced_from)
+            rows, delta_metadata = fetch(delta_filters)
+            metadata = delta_metadata or metadata
+            self.store(namespace, site_code, variable, rows, synced_from, delta_metadata)
+
+        return self.load(namespace, site_code, variable, time_filters), metadata
+
+    @staticmethod
+    def _requested_from(lower_filters):
+        """Earliest UTC timestamp the lower filters may need."""
+        bounds = [
+            to_timestamp(value) - (MAX_UTC_OFFSET if name.startswith('local') else 0)
+            for name, value in lower_filters.items()
+        ]
+        return max(bounds) if bounds else None
+
+    @staticmethod
+    def _covered_from(lower_filters):
+        """UTC timestamp from which a fetch with the lower filters returned every value."""
+        bounds = [
+            to_timestamp(value) + (MAX_UTC_OFFSET if name.startswith('local') else 0)
+            for name, value in lower_filters.items()
+        ]
+        return max(bounds) if bounds else None
+
+    @staticmethod
+    def _requested_until(upper_filters):
+        """Latest UTC timestamp the upper filters may need."""
+        bounds = [
+            to_timestamp(value) + (MAX_UTC_OFFSET if name.startswith('local') else 0)
+            for name, value in upper_filters.items()
+        ]
+        return min(bounds) if bounds else None
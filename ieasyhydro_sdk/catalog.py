@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+DEFAULT_SITE_CATALOG_TTL = 300
+
+
+def _copy_sites(sites):
+    # sites are flat dicts with a few small nested dicts (basin, region, ...), copying them one
+    # level deep is several times cheaper than `copy.deepcopy`
+    return [
+        {key: value.copy() if isinstance(value, (dict, list)) else value for key, value in site.items()}
+        for site in sites
+    ]
+
+
+def _atomic_write_json(path, data, indent=None):
+    # written to a temporary file in the same directory first, so readers never see a partial
+    # file; the temporary file is removed when writing fails
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(file_descriptor, 'w', encoding='utf-8') as json_file:
+            json.dump(data, json_file, indent=indent)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+class SiteCatalog:
+    """Cache of station listings shared by all site lookups of an SDK instance.
+
+    Listings younger than `ttl` seconds are served from memory (or from `directory`, which
+    can be shared by several processes). Older listings are revalidated with a conditional
+    request (If-None-Match / If-Modified-Since) when the server sent an ETag or
+    Last-Modified header, and fetched again otherwise.
+
+    Args:
+        ttl: Seconds a listing is used without contacting the server
+        directory: Optional directory where listings are stored as JSON files
+    """
+
+    def __init__(self, ttl=DEFAULT_SITE_CATALOG_TTL, directory=None):
+        self.ttl = ttl
+        self.directory = directory
+        self._entries = {}
+        self._mapped = {}
+        self._lock = threading.Lock()
+        # set by the SDK, see `ieasyhydro_sdk.instrumentation.Instrumentation`
+        self.instrumentation = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + '.json')
+
+    def _read(self, key):
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), encoding='utf-8') as catalog_file:
+                return json.load(catalog_file)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, key, entry):
+        if not self.directory:
+            return
+        _atomic_write_json(self._path(key), entry)
+
+    def _is_fresh(self, entry):
+        return entry is not None and time.time() - entry['fetched_at'] < self.ttl
+
+    def get(self, key, fetch, parse):
+        """Return the listing for key, fetching or revalidating it when needed.
+
+        Args:
+            key: Identifies the listing
+            fetch: Callable taking request headers and returning the API response,
+                expected to raise for error responses
+            parse: Callable extracting the listing from a 200 response
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if not self._is_fresh(entry):
+                stored_entry = self._read(key)
+                if stored_entry and (entry is None or stored_entry['fetched_at'] > entry['fetched_at']):
+                    entry = stored_entry
+                    self._entries[key] = entry
+                    self._mapped.pop(key, None)
+
+            if self._is_fresh(entry):
+                if self.instrumentation is not None:
+                    self.instrumentation.cache('site_catalog', True)
+                return entry['data']
+
+            headers = {}
+            if entry and entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry and entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+            response = fetch(headers)
+            revalidated = response.status_code == 304 and entry is not None
+            if self.instrumentation is not None:
+                self.instrumentation.cache('site_catalog', revalidated)
+            if revalidated:
+                entry = dict(entry, fetched_at=time.time())
+            else:
+                entry = {
+                    'fetched_at': time.time(),
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'data': parse(response),
+                }
+                self._mapped.pop(key, None)
+
+            self._entries[key] = entry
+            self._write(key, entry)
+            return entry['data']
+
+    def get_mapped(self, key, fetch, parse, transform, copy=True):
+        """Like `get`, but returns a copy of the sites of `transform(listing)`, which is only
+        computed when the listing changes. The sites and their nested dicts (basin, region, ...)
+        can be modified without affecting the cache. With copy=False the cached sites are
+        returned, they must not be modified."""
+        data = self.get(key, fetch, parse)
+        with self._lock:
+            mapped = self._mapped.get(key)
+            if mapped is None or mapped[0] is not data:
+                mapped = (data, transform(data))
+                self._mapped[key] = mapped
+        return _copy_sites(mapped[1]) if copy else mapped[1]
+
+    def invalidate(self, key=None):
+        """Drop one listing, or all listings if key is None, from memory and disk."""
+        with self._lock:
+            keys = list(self._entries) if key is None else [key]
+            for key_ in keys:
+                self._entries.pop(key_, None)
+                self._mapped.pop(key_, None)
+            if self.directory:
+                if key is None:
+                    paths = [
+                        os.path.join(self.directory, name)
+                        for name in os.listdir(self.directory) if name.endswith('.json')
+                    ]
+                else:
+                    paths = [self._path(key)]
+                for path in paths:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+DEFAULT_MEMO_SIZE = 256
+
+
+class _Call:
+    __slots__ = ('done', 'response', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+class RequestCoalescer:
+    """Lets concurrent identical GET requests share one upstream request.
+
+    The first caller of a key sends the request, callers arriving while it is in flight wait
+    for it and receive the same response object, including its parsed JSON body. With a `ttl`,
+    successful responses are also kept for that many seconds in a memo holding at most
+    `max_entries` responses, least recently used ones are dropped first.
+
+    Shared responses are returned to several callers, so their parsed bodies must not be modified.
+
+    Args:
+        ttl: Seconds successful responses are served from the memo, 0 to only share in-flight requests
+        max_entries: Maximum number of memoized responses
+    """
+
+    def __init__(self, ttl=0, max_entries=DEFAULT_MEMO_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._in_flight = {}
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        # set by the SDK, see `ieasyhydro_sdk.instrumentation.Instrumentation`
+        self.instrumentation = None
+
+    @staticmethod
+    def key(method, path, headers=None, params=None):
+        """Build the key of a request, independent of the order of its headers and parameters."""
+        def _normalize(items):
+            return tuple(sorted(
+                (str(name), tuple(str(item) for item in value) if isinstance(value, (list, tuple)) else str(value))
+                for name, value in (items or {}).items()
+                if value is not None
+            ))
+
+        return method.upper(), path, _normalize(headers), _normalize(params)
+
+    def _report(self, shared):
+        if self.instrumentation is not None:
+            self.instrumentation.cache('request_coalescing', shared)
+
+    def get(self, key, send):
+        """Return the response for key, calling `send()` only if no identical request is in
+        flight and no fresh memoized response exists."""
+        with self._lock:
+            memoized = self._memo.get(key)
+            if memoized is not None:
+                if time.monotonic() < memoized[0]:
+                    self._memo.move_to_end(key)
+                    self._report(True)
+                    return memoized[1]
+                del self._memo[key]
+
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._in_flight[key] = call
+
+        if not leader:
+            self._report(True)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.response
+
+        self._report(False)
+        try:
+            call.response = send()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                if self.ttl and call.error is None and call.response.status_code == 200:
+                    self._memo[key] = (time.monotonic() + self.ttl, call.response)
+                    self._memo.move_to_end(key)
+                    while len(self._memo) > self.max_entries:
+                        self._memo.popitem(last=False)
+            call.done.set()
+        return call.response
+
+    def clear(self):
+        """Drop all memoized responses."""
+        with self._lock:
+            self._memo.clear()
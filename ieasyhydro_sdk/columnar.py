@@ -0,0 +1,118 @@
+def _require_numpy():
+    # imported on first use, numpy noticeably slows down importing the SDK
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            'Columnar results require the "numpy" package. '
+            'Install it with "pip install ieasyhydro_sdk[columnar]".')
+    return numpy
+
+
+class DataValueColumns:
+    """Data values of one site and variable stored as arrays.
+
+    Timestamps are `datetime64[s]` arrays and values a float64 array (missing values are NaN),
+    site and variable details are held once instead of being repeated per value.
+    Timestamps are decoded as sent by the server, without applying the timezone of
+    the machine running the SDK.
+    """
+
+    __slots__ = ('site', 'variable', 'local_date_time', 'utc_date_time', 'data_value')
+
+    def __init__(self, site, variable, local_date_time, utc_date_time, data_value):
+        self.site = site
+        self.variable = variable
+        self.local_date_time = local_date_time
+        self.utc_date_time = utc_date_time
+        self.data_value = data_value
+
+    def __len__(self):
+        return len(self.data_value)
+
+    def __repr__(self):
+        site_code = self.site.get('site_code') if self.site else None
+        variable_code = self.variable.get('variable_code') if self.variable else None
+        return f'<DataValueColumns site={site_code} variable={variable_code} values={len(self)}>'
+
+    def to_dataframe(self):
+        """Return the values as a pandas DataFrame indexed by the UTC timestamp.
+
+        Site and variable details are stored in `DataFrame.attrs`.
+        """
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError(
+                'DataFrame conversion requires the "pandas" package. '
+                'Install it with "pip install ieasyhydro_sdk[pandas]".')
+
+        dataframe = pd.DataFrame(
+            {
+                'local_date_time': self.local_date_time,
+                'data_value': self.data_value,
+            },
+            index=pd.Index(self.utc_date_time, name='utc_date_time'),
+        )
+        dataframe.attrs['site'] = self.site
+        dataframe.attrs['variable'] = self.variable
+        return dataframe
+
+
+def legacy_values_to_columns(all_values, site=None, variable=None):
+    """Convert raw legacy API data values (epoch timestamps) to `DataValueColumns`."""
+    np = _require_numpy()
+    count = len(all_values)
+    return DataValueColumns(
+        site=site,
+        variable=variable,
+        local_date_time=np.fromiter(
+            (value['localDateTime'] for value in all_values), dtype=np.int64, count=count
+        ).astype('datetime64[s]'),
+        utc_date_time=np.fromiter(
+            (value['dateTimeUtc'] for value in all_values), dtype=np.int64, count=count
+        ).astype('datetime64[s]'),
+        data_value=np.array([value['dataValue'] for value in all_values], dtype=np.float64),
+    )
+
+
+def _strip_utc_designator(timestamp):
+    # numpy only parses naive ISO timestamps without deprecation warnings
+    if timestamp.endswith('Z'):
+        return timestamp[:-1]
+    if timestamp.endswith('+00:00'):
+        return timestamp[:-6]
+    return timestamp
+
+
+def hf_results_to_columns(results):
+    """Convert the `results` of the HF sdk-data-values endpoint to a list of `DataValueColumns`,
+    one per station and variable."""
+    np = _require_numpy()
+    columns = []
+    for station in results:
+        site = {
+            'id': station.get('station_id'),
+            'uuid': station.get('station_uuid'),
+            'site_code': station.get('station_code'),
+            'name': station.get('station_name'),
+            'site_type': station.get('station_type'),
+        }
+        for variable_data in station.get('data', []):
+            values = variable_data.get('values', [])
+            columns.append(DataValueColumns(
+                site=site,
+                variable={
+                    'variable_code': variable_data.get('variable_code'),
+                    'unit': variable_data.get('unit'),
+                },
+                local_date_time=np.array(
+                    [_strip_utc_designator(value['timestamp_local']) for value in values], dtype='datetime64[s]'
+                ),
+                utc_date_time=np.array(
+                    [_strip_utc_designator(value['timestamp_utc']) for value in values], dtype='datetime64[s]'
+                ),
+                data_value=np.array([value['value'] for value in values], dtype=np.float64),
+            ))
+
+    return columns
@@ -0,0 +1,399 @@
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from ieasyhydro_sdk.cache import to_timestamp
+from ieasyhydro_sdk.catalog import _atomic_write_json
+from ieasyhydro_sdk.instrumentation import logger
+
+
+SITE_KINDS = ('discharge', 'meteo', 'virtual')
+EXPORT_FORMATS = ('csv', 'parquet')
+MANIFEST_NAME = '_manifest.json'
+COLUMNS = ('site_code', 'variable_code', 'unit', 'timestamp_utc', 'timestamp_local', 'value')
+DEFAULT_EXPORT_SHARD = 'year'
+DEFAULT_SHARDS_IN_FLIGHT = 2
+
+
+def _partition_name(value):
+    # site codes and variable names end up in paths
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', str(value))
+
+
+class _CsvWriter:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(COLUMNS)
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError(
+                'Parquet export requires the "pyarrow" package. '
+                'Install it with "pip install ieasyhydro_sdk[parquet]".')
+
+        self.path = path
+        self._pa = pa
+        self._schema = pa.schema([
+            ('site_code', pa.string()),
+            ('variable_code', pa.string()),
+            ('unit', pa.string()),
+            ('timestamp_utc', pa.timestamp('s', tz='UTC')),
+            # kept as sent by the server, local timestamps carry the station offset
+            ('timestamp_local', pa.string()),
+            ('value', pa.float64()),
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows):
+        # every shard becomes a row group, so only the shards in flight are held in memory
+        columns = list(zip(*rows))
+        timestamps = [int(to_timestamp(timestamp)) for timestamp in columns[3]]
+        self._writer.write_table(self._pa.Table.from_arrays([
+            self._pa.array(columns[0], self._pa.string()),
+            self._pa.array(columns[1], self._pa.string()),
+            self._pa.array(columns[2], self._pa.string()),
+            self._pa.array(timestamps, self._pa.int64()).cast(self._schema.field('timestamp_utc').type),
+            self._pa.array(columns[4], self._pa.string()),
+            self._pa.array(columns[5], self._pa.float64()),
+        ], schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+class DataValuesExporter:
+    """Streams data values of many stations from the iEasyHydroHF SDK to files on disk.
+
+    Every station is exported by its own task, up to `max_workers` stations at a time. The server
+    returns the whole time window of a station at once, so the window is split into shards (one
+    request per year by default) which are written as they arrive. Memory use is bounded by the
+    shards in flight and not by the length of the series. An export without a start time cannot
+    be sharded; an export without an end time is sharded up to the current time. Values are
+    partitioned into one file per station and variable, `<directory>/site_code=<code>/<variable>.<format>`.
+
+    Finished stations are recorded in a manifest (`_manifest.json`) in the output directory. Running
+    the same export again skips them, so an interrupted export resumes where it stopped; files of
+    stations that were not finished are written again.
+
+    Args:
+        sdk: `IEasyHydroHFSDK` instance
+        directory: Output directory, created if it does not exist
+        file_format: 'csv' or 'parquet' (requires pyarrow)
+        max_workers: Number of stations exported concurrently, defaults to the SDK `max_workers`
+        max_in_flight: Maximum number of concurrently requested shards per station
+        shard: 'year', 'month' or a `timedelta` the time window of a station is split into,
+            None to request every station at once
+        progress: Optional callable called with the export statistics after every finished station
+    """
+
+    def __init__(
+            self,
+            sdk,
+            directory,
+            file_format='csv',
+            max_workers=None,
+            max_in_flight=DEFAULT_SHARDS_IN_FLIGHT,
+            shard=DEFAULT_EXPORT_SHARD,
+            progress=None,
+    ):
+        if file_format not in EXPORT_FORMATS:
+            raise ValueError(f"Invalid export format '{file_format}'. Must be one of: {', '.join(EXPORT_FORMATS)}")
+
+        self.sdk = sdk
+        self.directory = str(directory)
+        self.file_format = file_format
+        self.max_workers = max_workers or sdk.max_workers
+        self.max_in_flight = max_in_flight
+        self.shard = shard
+        self.progress = progress
+        self._lock = threading.Lock()
+        self._manifest = None
+        self._stats = None
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.directory, MANIFEST_NAME)
+
+    def resolve_site_codes(self, site_kinds):
+        """Return the codes of all sites of the given kinds ('discharge', 'meteo', 'virtual')."""
+        site_codes = []
+        for site_kind in site_kinds:
+            if site_kind not in SITE_KINDS:
+                raise ValueError(f"Invalid site kind '{site_kind}'. Must be one of: {', '.join(SITE_KINDS)}")
+            sites = getattr(self.sdk, f'get_{site_kind}_sites')()
+            site_codes += [site['site_code'] for site in sites if site['site_code'] not in site_codes]
+        return site_codes
+
+    def export(self, variable_names, site_codes=None, site_kinds=None, time_filters=None):
+        """Export the data values and return the export statistics.
+
+        Args:
+            variable_names: List of variable names, e.g. ['WDD', 'WLD']
+            site_codes: List of station codes
+            site_kinds: List of site kinds whose stations are exported, used if site_codes is None
+            time_filters: Time filters of the export, e.g. {'local_date_time__gte': '2020-01-01T00:00:00Z'}
+
+        Returns:
+            Dict with the number of exported `stations`, `skipped` (already exported) stations,
+            `rows`, elapsed `seconds` and `rows_per_second`
+        """
+        if not variable_names:
+            raise ValueError("You must specify at least one variable name")
+        if site_codes is None:
+            if not site_kinds:
+                raise ValueError("You must specify site codes or site kinds")
+            site_codes = self.resolve_site_codes(site_kinds)
+
+        os.makedirs(self.directory, exist_ok=True)
+        parameters = {
+            'variable_names': sorted(variable_names),
+            'time_filters': time_filters or {},
+            'file_format': self.file_format,
+        }
+        self._manifest = self._load_manifest(parameters)
+        pending = [site_code for site_code in site_codes if site_code not in self._manifest['completed']]
+        self._stats = {
+            'stations': 0,
+            'skipped': len(site_codes) - len(pending),
+            'rows': 0,
+            'seconds': 0.0,
+            'rows_per_second': 0.0,
+        }
+
+        time_filters, shard = self._shard_window(time_filters or {})
+        started_at = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(self._export_site, site_code, variable_names, time_filters, shard, started_at)
+                for site_code in pending
+            ]
+            for future in futures:
+                future.result()
+
+        self._update_stats(0, started_at)
+        logger.info(
+            'exported %d stations (%d skipped), %d rows in %.1fs (%.0f rows/s)',
+            self._stats['stations'], self._stats['skipped'], self._stats['rows'],
+            self._stats['seconds'], self._stats['rows_per_second'],
+        )
+        return dict(self._stats)
+
+    def _shard_window(self, time_filters):
+        """Return the time filters with an upper bound and the shard to export them with."""
+        if self.shard is None or 'utc_date_time' in time_filters or 'local_date_time' in time_filters:
+            return time_filters, None
+
+        lower_names = [name for name in time_filters if name.endswith(('__gt', '__gte'))]
+        if not lower_names:
+            logger.warning('export without a start time is not sharded, every station is requested at once')
+            return time_filters, None
+
+        if not any(name.endswith(('__lt', '__lte')) for name in time_filters):
+            column = lower_names[0].rsplit('__', 1)[0]
+            # a day ahead, local timestamps can be up to 14 hours ahead of UTC
+            end = datetime.now(timezone.utc) + timedelta(days=1)
+            time_filters = dict(time_filters, **{f'{column}__lt': end.isoformat()})
+        return time_filters, self.shard
+
+    def _load_manifest(self, parameters):
+        try:
+            with open(self.manifest_path, encoding='utf-8') as manifest_file:
+                manifest = json.load(manifest_file)
+        except FileNotFoundError:
+            return {'parameters': parameters, 'completed': {}}
+
+        if manifest.get('parameters') != parameters:
+            raise ValueError(
+                f"The export in {self.directory} was started with different parameters, "
+                f"use another directory or remove {MANIFEST_NAME} to start over"
+            )
+        return manifest
+
+    def _write_manifest(self):
+        _atomic_write_json(self.manifest_path, self._manifest, indent=2)
+
+    def _open_writer(self, path):
+        if self.file_format == 'parquet':
+            return _ParquetWriter(path)
+        return _CsvWriter(path)
+
+    def _export_site(self, site_code, variable_names, time_filters, shard, started_at):
+        site_directory = os.path.join(self.directory, f'site_code={_partition_name(site_code)}')
+        os.makedirs(site_directory, exist_ok=True)
+
+        filters = {
+            'site_codes': [site_code],
+            'variable_names': list(variable_names),
+            **time_filters,
+        }
+
+        writers = {}
+        rows_written = 0
+        try:
+            stations = self.sdk.iter_data_values_for_site(
+                filters=filters, max_in_flight=self.max_in_flight, shard=shard
+            )
+            for station in stations:
+                station_code = station.get('station_code', site_code)
+                for variable_data in station.get('data', []):
+                    values = variable_data.get('values', [])
+                    if not values:
+                        continue
+                    variable_code = variable_data.get('variable_code')
+                    writer = writers.get(variable_code)
+                    if writer is None:
+                        path = os.path.join(site_directory, f'{_partition_name(variable_code)}.{self.file_format}')
+                        # finished files are renamed, a leftover .part file marks an interrupted station
+                        writer = self._open_writer(path + '.part')
+                        writers[variable_code] = writer
+                    writer.write([
+                        (
+                            station_code,
+                            variable_code,
+                            variable_data.get('unit'),
+                            value['timestamp_utc'],
+                            value['timestamp_local'],
+                            value['value'],
+                        )
+                        for value in values
+                    ])
+                    rows_written += len(values)
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        files = []
+        for writer in writers.values():
+            final_path = writer.path[:-len('.part')]
+            os.replace(writer.path, final_path)
+            files.append(os.path.relpath(final_path, self.directory))
+
+        with self._lock:
+            self._manifest['completed'][site_code] = {'rows': rows_written, 'files': sorted(files)}
+            self._write_manifest()
+            self._stats['stations'] += 1
+            self._update_stats(rows_written, started_at)
+            stats = dict(self._stats)
+
+        if self.progress is not None:
+            self.progress(stats)
+
+    def _update_stats(self, rows, started_at):
+        self._stats['rows'] += rows
+        self._stats['seconds'] = time.monotonic() - started_at
+        if self._stats['seconds'] > 0:
+            self._stats['rows_per_second'] = self._stats['rows'] / self._stats['seconds']
+
+
+def export_data_values(
+        sdk,
+        directory,
+        variable_names,
+        site_codes=None,
+        site_kinds=None,
+        time_filters=None,
+        file_format='csv',
+        **kwargs,
+):
+    """Export data values to partitioned files, see `DataValuesExporter` for the details.
+
+    Args:
+        sdk: `IEasyHydroHFSDK` instance
+        directory: Output directory
+        variable_names: List of variable names
+        site_codes: List of station codes
+        site_kinds: List of site kinds ('discharge', 'meteo', 'virtual'), used if site_codes is None
+        time_filters: Time filters of the export
+        file_format: 'csv' or 'parquet'
+        kwargs: Additional `DataValuesExporter` arguments
+    """
+    exporter = DataValuesExporter(sdk, directory, file_format=file_format, **kwargs)
+    return exporter.export(variable_names, site_codes=site_codes, site_kinds=site_kinds, time_filters=time_filters)
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog='ieasyhydro-export',
+        description='Export iEasyHydroHF data values to partitioned CSV or Parquet files. '
+                    'Credentials are read from the IEASYHYDROHF_* environment variables.',
+    )
+    parser.add_argument('directory', help='output directory, an interrupted export resumes from its manifest')
+    parser.add_argument('-v', '--variable', dest='variable_names', action='append', required=True,
+                        help='variable name, e.g. WDD (repeatable)')
+    parser.add_argument('-s', '--site', dest='site_codes', action='append',
+                        help='station code (repeatable)')
+    parser.add_argument('-k', '--site-kind', dest='site_kinds', action='append', choices=SITE_KINDS,
+                        help='export all stations of this kind (repeatable)')
+    parser.add_argument('--from', dest='start', help='first local timestamp, e.g. 2020-01-01T00:00:00Z')
+    parser.add_argument('--until', dest='end', help='local timestamp the export ends before')
+    parser.add_argument('-f', '--format', dest='file_format', choices=EXPORT_FORMATS, default='csv')
+    parser.add_argument('-w', '--workers', dest='max_workers', type=int, help='stations exported concurrently')
+    parser.add_argument('--shard', choices=('year', 'month', 'none'), default=DEFAULT_EXPORT_SHARD,
+                        help='length of the time shards every station is requested in (default: %(default)s)')
+    parser.add_argument('--in-flight', dest='max_in_flight', type=int, default=DEFAULT_SHARDS_IN_FLIGHT,
+                        help='shards of a station requested concurrently (default: %(default)s)')
+    args = parser.parse_args(argv)
+    if not args.site_codes and not args.site_kinds:
+        parser.error('specify stations with --site or --site-kind')
+    return args
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+
+    from ieasyhydro_sdk.sdk import IEasyHydroHFSDK
+    time_filters = {}
+    if args.start:
+        time_filters['local_date_time__gte'] = args.start
+    if args.end:
+        time_filters['local_date_time__lt'] = args.end
+
+    def _report(stats):
+        print(
+            f"{stats['stations']} stations, {stats['rows']} rows, {stats['rows_per_second']:.0f} rows/s",
+            file=sys.stderr,
+        )
+
+    with IEasyHydroHFSDK() as sdk:
+        stats = export_data_values(
+            sdk,
+            args.directory,
+            args.variable_names,
+            site_codes=args.site_codes,
+            site_kinds=args.site_kinds,
+            time_filters=time_filters,
+            file_format=args.file_format,
+            max_workers=args.max_workers,
+            max_in_flight=args.max_in_flight,
+            shard=None if args.shard == 'none' else args.shard,
+            progress=_report,
+        )
+    print(
+        f"Exported {stats['stations']} stations ({stats['skipped']} already exported), "
+        f"{stats['rows']} rows in {stats['seconds']:.1f}s ({stats['rows_per_second']:.0f} rows/s)"
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -46,6 +46,8 @@ class BasicHFDataValueFilters(TypedDict, total=False):
     variable_names: Optional[List[str]]
     page: Optional[int]
     page_size: Optional[int]
+    view_type: Optional[str]
+    display_type: Optional[str]
 
 
 class GetHFDataValuesFilters(BasicHFDataValueFilters):
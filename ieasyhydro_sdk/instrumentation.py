@@ -0,0 +1,123 @@
+import logging
+
+
+logger = logging.getLogger('ieasyhydro_sdk')
+
+
+class Instrumentation:
+    """Hooks called by the SDK to report where time goes.
+
+    All hooks do nothing, subclass and override the ones you need and pass an instance as
+    `instrumentation` to the SDK. Without instrumentation the SDK skips all measurements.
+    """
+
+    def request(self, method, path, status_code, latency, bytes_received):
+        """An HTTP request finished, status_code is None if it failed without a response."""
+
+    def retry(self, method, path, attempt, reason):
+        """A request is retried, reason is the status code or the exception name."""
+
+    def json_decoded(self, path, seconds, bytes_decoded):
+        """A response body was decoded."""
+
+    def pages(self, path, page_count):
+        """All pages of a paginated listing were fetched."""
+
+    def cache(self, name, hit):
+        """A cache (site_catalog, station_index, data_values) was consulted."""
+
+    def mapping(self, name, seconds, record_count):
+        """API data was mapped to the SDK output format."""
+
+
+class LoggingInstrumentation(Instrumentation):
+    """Reports all measurements to the `ieasyhydro_sdk` logger.
+
+    Args:
+        level: Logging level of the messages
+    """
+
+    def __init__(self, level=logging.DEBUG):
+        self.level = level
+
+    def request(self, method, path, status_code, latency, bytes_received):
+        logger.log(
+            self.level, '%s %s -> %s in %.3fs, %d bytes',
+            method.upper(), path, status_code, latency, bytes_received,
+        )
+
+    def retry(self, method, path, attempt, reason):
+        logger.log(self.level, 'retrying %s %s (attempt %d) after %s', method.upper(), path, attempt, reason)
+
+    def json_decoded(self, path, seconds, bytes_decoded):
+        logger.log(self.level, 'decoded %d bytes of %s in %.3fs', bytes_decoded, path, seconds)
+
+    def pages(self, path, page_count):
+        logger.log(self.level, 'fetched %d pages of %s', page_count, path)
+
+    def cache(self, name, hit):
+        logger.log(self.level, '%s cache %s', name, 'hit' if hit else 'miss')
+
+    def mapping(self, name, seconds, record_count):
+        logger.log(self.level, 'mapped %d records in %s in %.3fs', record_count, name, seconds)
+
+
+class PrometheusInstrumentation(Instrumentation):
+    """Exports the measurements as Prometheus metrics, requires `prometheus_client`.
+
+    Args:
+        registry: Registry the metrics are registered in, the default registry if None
+        namespace: Prefix of the metric names
+    """
+
+    def __init__(self, registry=None, namespace='ieasyhydro_sdk'):
+        try:
+            from prometheus_client import REGISTRY, Counter, Histogram
+        except ImportError:
+            raise ImportError(
+                'PrometheusInstrumentation requires the "prometheus_client" package. '
+                'Install it with "pip install ieasyhydro_sdk[prometheus]".')
+
+        registry = registry or REGISTRY
+        self.request_latency = Histogram(
+            'request_latency_seconds', 'Latency of API requests',
+            ['method', 'status_code'], namespace=namespace, registry=registry,
+        )
+        self.bytes_received = Counter(
+            'received_bytes', 'Bytes received from the API', namespace=namespace, registry=registry,
+        )
+        self.retries = Counter(
+            'retries', 'Retried API requests', ['reason'], namespace=namespace, registry=registry,
+        )
+        self.json_decode_time = Histogram(
+            'json_decode_seconds', 'Time spent decoding response bodies', namespace=namespace, registry=registry,
+        )
+        self.page_count = Histogram(
+            'pages', 'Pages fetched per paginated listing', namespace=namespace, registry=registry,
+            buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, float('inf')),
+        )
+        self.cache_lookups = Counter(
+            'cache_lookups', 'Cache lookups', ['cache', 'result'], namespace=namespace, registry=registry,
+        )
+        self.mapping_time = Histogram(
+            'mapping_seconds', 'Time spent mapping API data', ['name'], namespace=namespace, registry=registry,
+        )
+
+    def request(self, method, path, status_code, latency, bytes_received):
+        self.request_latency.labels(method.upper(), str(status_code)).observe(latency)
+        self.bytes_received.inc(bytes_received)
+
+    def retry(self, method, path, attempt, reason):
+        self.retries.labels(str(reason)).inc()
+
+    def json_decoded(self, path, seconds, bytes_decoded):
+        self.json_decode_time.observe(seconds)
+
+    def pages(self, path, page_count):
+        self.page_count.observe(page_count)
+
+    def cache(self, name, hit):
+        self.cache_lookups.labels(name, 'hit' if hit else 'miss').inc()
+
+    def mapping(self, name, seconds, record_count):
+        self.mapping_time.labels(name).observe(seconds)
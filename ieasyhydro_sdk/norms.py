@@ -0,0 +1,101 @@
+from ieasyhydro_sdk.columnar import DataValueColumns, _require_numpy
+
+
+# norm period -> number of periods per year
+NORM_PERIOD_LENGTHS = {
+    'd': 36,  # decades, 3 per month (days 1-10, 11-20, 21-end)
+    'p': 72,  # pentads, 6 per month (days 1-5, 6-10, ..., 26-end)
+    'm': 12,
+}
+
+
+def period_index(dates, norm_period):
+    """Return the zero based index of the decade, pentad or month of every date.
+
+    Args:
+        dates: Array-like of datetime64 values (or anything `numpy.asarray` converts to them)
+        norm_period: 'd' (decade), 'p' (pentad) or 'm' (month)
+    """
+    np = _require_numpy()
+    if norm_period not in NORM_PERIOD_LENGTHS:
+        raise ValueError(
+            f"Invalid norm period '{norm_period}'. Must be one of: {', '.join(NORM_PERIOD_LENGTHS.keys())}"
+        )
+
+    dates = np.asarray(dates, dtype='datetime64[s]')
+    months = dates.astype('datetime64[M]')
+    month_index = (months - months.astype('datetime64[Y]')).astype(np.int64)
+    if norm_period == 'm':
+        return month_index
+
+    day = (dates.astype('datetime64[D]') - months).astype(np.int64)
+    if norm_period == 'd':
+        return month_index * 3 + np.minimum(day // 10, 2)
+    return month_index * 6 + np.minimum(day // 5, 5)
+
+
+class NormComparison:
+    """Data values compared to the norm of their period, all arrays aligned with the values.
+
+    `anomaly` is the difference to the norm and `ratio` the value divided by the norm, both are NaN
+    where the value or the norm is missing (and `ratio` where the norm is 0).
+    """
+
+    __slots__ = ('period_index', 'data_value', 'norm', 'anomaly', 'ratio')
+
+    def __init__(self, period_index, data_value, norm, anomaly, ratio):
+        self.period_index = period_index
+        self.data_value = data_value
+        self.norm = norm
+        self.anomaly = anomaly
+        self.ratio = ratio
+
+    def __len__(self):
+        return len(self.data_value)
+
+    def __repr__(self):
+        return f'<NormComparison values={len(self)}>'
+
+
+def compare_to_norm(values, norm, norm_period='d', dates=None):
+    """Align data values with a norm and compute their anomaly and ratio to it.
+
+    Periods are taken from the local timestamps, so values are compared to the norm of the
+    decade, pentad or month they were measured in at the station.
+
+    Args:
+        values: `DataValueColumns`, or an array-like of values together with `dates`
+        norm: Norm as returned by `get_norm_for_site` (a list, a `Norm` record or the dict of
+            the legacy SDK), missing norm values may be None
+        norm_period: Period of the norm, 'd' (decade), 'p' (pentad) or 'm' (month)
+        dates: Dates of the values, required if values is not a `DataValueColumns`
+    """
+    np = _require_numpy()
+    if isinstance(values, DataValueColumns):
+        dates = values.local_date_time
+        values = values.data_value
+    elif dates is None:
+        raise ValueError("Dates are required unless the values are DataValueColumns")
+
+    if isinstance(norm, dict):
+        norm_values = norm['norm_data']
+    elif isinstance(norm, (list, tuple)) or hasattr(norm, '__array__'):
+        norm_values = norm
+    else:
+        norm_values = norm.values
+    if len(norm_values) and len(norm_values) != NORM_PERIOD_LENGTHS.get(norm_period, len(norm_values)):
+        raise ValueError(
+            f"Norm has {len(norm_values)} values, expected {NORM_PERIOD_LENGTHS[norm_period]} "
+            f"for norm period '{norm_period}'"
+        )
+
+    index = period_index(dates, norm_period)
+    data_value = np.asarray(values, dtype=np.float64)
+    norm_array = np.array([np.nan if value is None else value for value in norm_values], dtype=np.float64)
+    aligned_norm = norm_array[index] if len(norm_array) else np.full(len(index), np.nan)
+
+    anomaly = data_value - aligned_norm
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(aligned_norm != 0, data_value / aligned_norm, np.nan)
+
+    return NormComparison(index, data_value, aligned_norm, anomaly, ratio)
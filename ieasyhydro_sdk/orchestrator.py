@@ -0,0 +1,167 @@
+import math
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from ieasyhydro_sdk.instrumentation import logger
+from ieasyhydro_sdk.sdk_base import IEasyHydroHFSDKBase
+
+
+DEFAULT_JOB_RETRIES = 2
+
+# client of the current worker process, created by `_init_worker`
+_worker_sdk = None
+
+
+def _init_worker(sdk_class, sdk_kwargs, auth_state):
+    global _worker_sdk
+    sdk_kwargs = dict(sdk_kwargs)
+    if issubclass(sdk_class, IEasyHydroHFSDKBase):
+        sdk_kwargs.setdefault('lazy_login', True)
+    _worker_sdk = sdk_class(**sdk_kwargs)
+    # the token of the parent process is reused, workers only log in once it expires
+    _worker_sdk.import_auth_state(auth_state)
+
+
+def worker_sdk_kwargs(sdk, processes):
+    """Return the arguments creating a worker client with the settings of sdk.
+
+    The transport, cache file, timeouts, retries, thread pool size and site catalog settings
+    are copied. The rate limit and the maximum concurrency of sdk are split between the
+    processes, so all workers together stay within the limits of the parent client.
+    Instrumentation and request coalescing are not copied.
+
+    Args:
+        sdk: `IEasyHydroSDK` or `IEasyHydroHFSDK` whose settings are copied
+        processes: Number of worker processes sharing the limits
+    """
+    rate_limiter = sdk.rate_limiter
+    sdk_kwargs = {
+        'host': sdk.host,
+        'username': sdk.username,
+        'password': sdk.password,
+        'organization_id': sdk.organization_id,
+        'transport': sdk.transport,
+        'timeout': sdk.timeout,
+        'max_retries': sdk.max_retries,
+        'max_workers': sdk.max_workers,
+        'rate_limit': rate_limiter.max_rate / processes if rate_limiter.max_rate else None,
+        'max_concurrency': max(1, math.ceil(rate_limiter.max_concurrency / processes)),
+        'cache': sdk.cache.path if sdk.cache is not None else None,
+        'site_catalog_ttl': sdk.site_catalog.ttl,
+        'site_catalog_dir': sdk.site_catalog.directory,
+    }
+    if isinstance(sdk, IEasyHydroHFSDKBase):
+        sdk_kwargs['token_refresh_margin'] = sdk.token_refresh_margin
+    return sdk_kwargs
+
+
+def fetch_data_values(sdk, job):
+    """Default job handler, calls `sdk.get_data_values_for_site(**job)`."""
+    return sdk.get_data_values_for_site(**job)
+
+
+def _run_job(handler, job):
+    return handler(_worker_sdk, job)
+
+
+class SyncOrchestrator:
+    """Runs data value jobs on a pool of worker processes, so decoding and mapping scale with the cores.
+
+    Every worker process has its own client, authenticated with the token of the given
+    client, which only logs in once. The worker clients copy the settings of the given client
+    (see `worker_sdk_kwargs`), its rate limit and maximum concurrency are split between the
+    processes. A job is a dict of keyword arguments of
+    `get_data_values_for_site` (e.g. `{'filters': {...}, 'all_pages': True}` for iEasyHydroHF, or
+    `{'site_code': '15194', 'variable_type': 'discharge_daily'}` for the legacy SDK); a custom
+    handler can run other work. Results are pickled back to the calling process, so the
+    arrays of `columnar=True` results are the cheapest to transfer.
+
+    Args:
+        sdk: Authenticated `IEasyHydroSDK` or `IEasyHydroHFSDK`, its class, credentials and
+            settings are used to create the worker clients
+        processes: Number of worker processes, defaults to the number of cores
+        retries: How many times a failed job is run again
+        handler: Module level function called as `handler(sdk, job)` in the workers,
+            `fetch_data_values` by default
+        sdk_kwargs: Arguments of the worker clients overriding the copied settings, e.g. `max_workers`
+    """
+
+    def __init__(
+            self,
+            sdk,
+            processes=None,
+            retries=DEFAULT_JOB_RETRIES,
+            handler=fetch_data_values,
+            sdk_kwargs=None,
+    ):
+        self.sdk = sdk
+        self.processes = processes or os.cpu_count() or 1
+        self.retries = retries
+        self.handler = handler
+        self.sdk_kwargs = {
+            **worker_sdk_kwargs(sdk, self.processes),
+            **(sdk_kwargs or {}),
+        }
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Stop a running `run`: pending jobs are dropped and running jobs are waited for."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def run(self, jobs, progress=None):
+        """Run the jobs and return one result dict per job, in the order of the jobs.
+
+        Args:
+            jobs: List of jobs
+            progress: Optional callable called as `progress(done, total, job, result)` in the
+                calling process after every finished job
+
+        Returns:
+            List of dicts with the handler `result`, the `error` message of the last attempt
+            (None if the job succeeded) and the number of `attempts`; jobs dropped by `cancel`
+            have the error 'cancelled'
+        """
+        jobs = list(jobs)
+        results = [{'result': None, 'error': 'cancelled', 'attempts': 0} for _ in jobs]
+        self._cancelled.clear()
+        done = 0
+
+        with ProcessPoolExecutor(
+                max_workers=self.processes,
+                initializer=_init_worker,
+                initargs=(type(self.sdk), self.sdk_kwargs, self.sdk.export_auth_state()),
+        ) as executor:
+            pending = {executor.submit(_run_job, self.handler, job): index for index, job in enumerate(jobs)}
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index = pending.pop(future)
+                    result = results[index]
+                    if future.cancelled():
+                        result['error'] = 'cancelled'
+                        continue
+                    result['attempts'] += 1
+                    error = future.exception()
+                    if error is None:
+                        result.update(result=future.result(), error=None)
+                    else:
+                        result['error'] = str(error)
+                        if result['attempts'] <= self.retries and not self.cancelled:
+                            logger.debug('retrying job %d after %s (attempt %d)', index, error, result['attempts'])
+                            pending[executor.submit(_run_job, self.handler, jobs[index])] = index
+                            continue
+
+                    done += 1
+                    if progress is not None:
+                        progress(done, len(jobs), jobs[index], result)
+
+                if self.cancelled:
+                    for future in pending:
+                        future.cancel()
+
+        return results
@@ -0,0 +1,120 @@
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import List, Optional
+
+
+@dataclass(slots=True)
+class Basin:
+    official_name: Optional[str]
+    national_name: Optional[str]
+
+
+@dataclass(slots=True)
+class Region:
+    official_name: Optional[str]
+    national_name: Optional[str]
+
+
+@dataclass(slots=True)
+class Site:
+    """Site of the iEasyHydroHF SDK, see `IEasyHydroHFSDK.map_site_data`."""
+    id: int
+    site_code: str
+    site_type: Optional[str]
+    basin: Basin
+    region: Region
+    official_name: Optional[str]
+    national_name: Optional[str]
+    country: Optional[str]
+    latitude: Optional[float]
+    longitude: Optional[float]
+    elevation: Optional[float]
+    bulletin_order: Optional[int] = None
+    dangerous_discharge: Optional[float] = None
+    historical_discharge_minimum: Optional[float] = None
+    historical_discharge_maximum: Optional[float] = None
+    enabled_forecasts: Optional[dict] = None
+    associations: Optional[list] = None
+
+    @classmethod
+    def from_dict(cls, data):
+        # nested values are copied, so records can be built from the cached site dicts
+        enabled_forecasts = data.get('enabled_forecasts')
+        associations = data.get('associations')
+        return cls(**{
+            **data,
+            'basin': Basin(**data['basin']),
+            'region': Region(**data['region']),
+            'enabled_forecasts': dict(enabled_forecasts) if enabled_forecasts is not None else None,
+            'associations': list(associations) if associations is not None else None,
+        })
+
+    def to_dict(self):
+        data = asdict(self)
+        # only virtual sites have associations in the dict output, None when the API sent none
+        if self.site_type != 'virtual':
+            del data['associations']
+        return data
+
+
+@dataclass(slots=True)
+class LegacySite:
+    """Site of the legacy iEasyHydro SDK, see `IEasyHydroSDK.map_site_data`."""
+    id: int
+    site_code: str
+    basin: Optional[str]
+    latitude: Optional[float]
+    longitude: Optional[float]
+    country: Optional[str]
+    is_virtual: bool
+    region: Optional[str]
+    site_type: Optional[str]
+    site_name: Optional[str]
+    organization_id: Optional[int]
+    elevation: Optional[float]
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class DataValue:
+    data_value: Optional[float]
+    local_date_time: datetime
+    utc_date_time: datetime
+
+    def to_dict(self):
+        return {
+            'data_value': self.data_value,
+            'local_date_time': self.local_date_time,
+            'utc_date_time': self.utc_date_time,
+        }
+
+
+@dataclass(slots=True)
+class Norm:
+    """Norm values of a site, one value per period (decade, pentad or month)."""
+    values: List[Optional[float]]
+    site_code: Optional[str] = None
+    norm_type: Optional[str] = None
+    norm_period: Optional[str] = None
+    start_year: Optional[int] = None
+    end_year: Optional[int] = None
+    site_id: Optional[int] = None
+
+    def to_dict(self):
+        """Return the norm in the format of the legacy `IEasyHydroSDK.get_norm_for_site`."""
+        return {
+            'norm_data': list(self.values),
+            'start_year': self.start_year,
+            'end_year': self.end_year,
+            'site_id': self.site_id,
+        }
+
+    def to_list(self):
+        """Return the norm values in the format of `IEasyHydroHFSDK.get_norm_for_site`."""
+        return list(self.values)
@@ -0,0 +1,79 @@
+from ieasyhydro_sdk.columnar import DataValueColumns, _require_numpy
+from ieasyhydro_sdk.norms import period_index
+
+
+RESAMPLE_PERIODS = ('daily', 'pentad', 'decade', 'month')
+RESAMPLE_AGGREGATIONS = ('mean', 'sum', 'min', 'max', 'count')
+
+
+def period_start(dates, period):
+    """Return the local start date of the day, pentad, decade or month of every date.
+
+    Args:
+        dates: Array-like of datetime64 values
+        period: 'daily', 'pentad', 'decade' or 'month'
+    """
+    np = _require_numpy()
+    if period not in RESAMPLE_PERIODS:
+        raise ValueError(f"Invalid period '{period}'. Must be one of: {', '.join(RESAMPLE_PERIODS)}")
+
+    dates = np.asarray(dates, dtype='datetime64[s]')
+    if period == 'daily':
+        return dates.astype('datetime64[D]')
+
+    months = dates.astype('datetime64[M]').astype('datetime64[D]')
+    if period == 'month':
+        return months
+    if period == 'decade':
+        return months + (period_index(dates, 'd') % 3) * 10
+    return months + (period_index(dates, 'p') % 6) * 5
+
+
+def resample(series, period='daily', how='mean'):
+    """Aggregate a data value series into days, pentads, decades or months on the client.
+
+    Periods follow the local timestamps. Missing values (NaN) are left out, periods without
+    values are not returned. The UTC timestamp of a period is its local start shifted by the
+    UTC offset of the first value in the period.
+
+    Args:
+        series: `DataValueColumns` as returned with `columnar=True`
+        period: 'daily', 'pentad', 'decade' or 'month'
+        how: 'mean', 'sum', 'min', 'max' or 'count'
+
+    Returns:
+        `DataValueColumns` with one value per period, the aggregation is added to the variable
+        details as `resampled`
+    """
+    np = _require_numpy()
+    if how not in RESAMPLE_AGGREGATIONS:
+        raise ValueError(f"Invalid aggregation '{how}'. Must be one of: {', '.join(RESAMPLE_AGGREGATIONS)}")
+
+    present = ~np.isnan(series.data_value)
+    values = series.data_value[present]
+    local_date_time = series.local_date_time[present]
+    utc_offset = local_date_time - series.utc_date_time[present]
+
+    starts, first, groups = np.unique(
+        period_start(local_date_time, period), return_index=True, return_inverse=True
+    )
+    groups = groups.reshape(-1)
+    count = np.bincount(groups, minlength=len(starts))
+    if how == 'count':
+        aggregated = count.astype(np.float64)
+    elif how in ('mean', 'sum'):
+        aggregated = np.bincount(groups, weights=values, minlength=len(starts))
+        if how == 'mean':
+            aggregated = aggregated / count
+    else:
+        aggregated = np.full(len(starts), np.inf if how == 'min' else -np.inf)
+        (np.minimum if how == 'min' else np.maximum).at(aggregated, groups, values)
+
+    local_starts = starts.astype('datetime64[s]')
+    return DataValueColumns(
+        site=series.site,
+        variable=dict(series.variable or {}, resampled={'period': period, 'how': how}),
+        local_date_time=local_starts,
+        utc_date_time=local_starts - utc_offset[first],
+        data_value=aggregated,
+    )
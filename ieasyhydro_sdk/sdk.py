@@ -1,5 +1,14 @@
-from datetime import datetime
-
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from itertools import islice
+from urllib.parse import quote, urlencode
+
+from ieasyhydro_sdk.cache import TIME_FILTERS, to_timestamp, utc_datetime
+from ieasyhydro_sdk.sharding import shard_filters
+from ieasyhydro_sdk.records import DataValue, LegacySite, Norm, Site
+from ieasyhydro_sdk.columnar import legacy_values_to_columns, hf_results_to_columns
 from ieasyhydro_sdk.sdk_endpoint_definitions import IEasyHydroSDKEndpointsBase, IEasyHydroHFSDKEndpointsBase
 from ieasyhydro_sdk.filters import GetDataValueFilters, GetHFDataValuesFilters
 
@@ -27,6 +36,9 @@ variable_variable_code_map = {
     'discharge_historical_decade_average': '0020',
 }
 
+# conservative limit for the length of request URLs accepted by servers and proxies
+DEFAULT_MAX_URL_LENGTH = 2000
+
 
 class IEasyHydroSDK(IEasyHydroSDKEndpointsBase):
 
@@ -50,30 +62,37 @@ class IEasyHydroSDK(IEasyHydroSDKEndpointsBase):
 
         return response_data
 
-    def get_discharge_sites(self):
-        all_resources = self._call_get_discharge_sites().json()['resources']
-        return self.map_site_data(all_resources)
+    def _get_sites(self, site_kind, call_get_sites):
+        return self.site_catalog.get_mapped(
+            self._site_catalog_key(site_kind),
+            lambda headers: call_get_sites(headers=headers),
+            lambda response: self._response_json(response)['resources'],
+            lambda resources: self._map_timed('map_site_data', self.map_site_data, resources),
+        )
 
-    def get_meteo_sites(self):
-        all_resources = self._call_get_meteo_sites().json()['resources']
-        return self.map_site_data(all_resources)
+    def get_discharge_sites(self, as_records=False):
+        sites = self._get_sites('discharge', self._call_get_discharge_sites)
+        return [LegacySite.from_dict(site) for site in sites] if as_records else sites
 
-    def get_norm_for_site(self, site_code, data_type):
+    def get_meteo_sites(self, as_records=False):
+        sites = self._get_sites('meteo', self._call_get_meteo_sites)
+        return [LegacySite.from_dict(site) for site in sites] if as_records else sites
+
+    def get_norm_for_site(self, site_code, data_type, as_records=False):
         response = self._call_get_norm_for_site(site_code, data_type)
-        resources = response.json()['resources']
-        return {
-            'norm_data': resources[0]['normData'],
-            'start_year': resources[0]['startYear'],
-            'end_year': resources[0]['endYear'],
-            'site_id': resources[0]['siteId'],
-        }
+        resources = self._response_json(response)['resources']
+        norm = Norm(
+            values=resources[0]['normData'],
+            site_code=site_code,
+            norm_type=data_type,
+            start_year=resources[0]['startYear'],
+            end_year=resources[0]['endYear'],
+            site_id=resources[0]['siteId'],
+        )
+        return norm if as_records else norm.to_dict()
 
-    def get_data_values_for_site(
-            self,
-            site_code,
-            variable_type,
-            filters=None,
-    ):
+    @staticmethod
+    def _build_data_value_filters(site_code, variable_type, filters=None):
         variable_code = variable_variable_code_map[variable_type]
         variable_codes = [variable_code]
         site_codes = [site_code]
@@ -87,41 +106,229 @@ class IEasyHydroSDK(IEasyHydroSDKEndpointsBase):
         if filters:
             filters_.update(filters)
 
-        all_values = self._get_all_pages(self._call_get_data_values(filters_, page_size=1000))
-
-        values_prepared = []
+        return filters_
 
-        if not all_values:
-            return []
-
-        return_data = {
+    @staticmethod
+    def _prepare_site_and_variable(value, site_code, variable_type):
+        return {
             'site': {
-                'name': all_values[0]['site']['siteName'],
-                'region': all_values[0]['site']['region'],
+                'name': value['site']['siteName'],
+                'region': value['site']['region'],
                 'site_code': site_code,
-                'basin': all_values[0]['site']['basin'],
-                'longitude': all_values[0]['site']['longitude'],
-                'latitude': all_values[0]['site']['latitude'],
+                'basin': value['site']['basin'],
+                'longitude': value['site']['longitude'],
+                'latitude': value['site']['latitude'],
             },
             'variable': {
-                'variable_code': all_values[0]['variable']['variablecode'],
-                'variable_name': all_values[0]['variable']['variableName']['term'],
-                'unit': all_values[0]['variable']['variableUnit']['unitAbbv'],
+                'variable_code': value['variable']['variablecode'],
+                'variable_name': value['variable']['variableName']['term'],
+                'unit': value['variable']['variableUnit']['unitAbbv'],
                 'variable_type': variable_type,
             }
         }
 
-        for value in all_values:
-            values_prepared.append({
-                'data_value': value['dataValue'],
-                'local_date_time': datetime.fromtimestamp(value['localDateTime']),
-                'utc_date_time': datetime.fromtimestamp(value['dateTimeUtc']),
-            })
+    def _prepare_data_values(self, values):
+        return [self._prepare_data_value(value) for value in values]
+
+    @staticmethod
+    def _prepare_data_value_records(values):
+        return [
+            DataValue(
+                value['dataValue'],
+                datetime.fromtimestamp(value['localDateTime']),
+                datetime.fromtimestamp(value['dateTimeUtc']),
+            )
+            for value in values
+        ]
+
+    @staticmethod
+    def _prepare_data_value(value):
+        return {
+            'data_value': value['dataValue'],
+            'local_date_time': datetime.fromtimestamp(value['localDateTime']),
+            'utc_date_time': datetime.fromtimestamp(value['dateTimeUtc']),
+        }
+
+    def get_data_values_for_site(
+            self,
+            site_code,
+            variable_type,
+            filters=None,
+            columnar=False,
+            as_records=False,
+    ):
+        """
+        Get all data values of a variable for a site.
 
-        return_data['data_values'] = values_prepared
+        Args:
+            site_code: Site code
+            variable_type: Key of `variable_variable_code_map`
+            filters: Additional data value filters
+            columnar: If True, return a `DataValueColumns` with numpy arrays instead of
+                a dict with a list of values (requires numpy)
+            as_records: If True, `data_values` holds compact `DataValue` records instead of dicts
+
+        With a configured `cache` and only time filters, only values missing from the
+        cache are requested and the result is served from the cache.
+        """
+        if self.cache is not None and all(name in TIME_FILTERS for name in (filters or {})):
+            all_values, site_and_variable = self._sync_cached_data_values(site_code, variable_type, filters or {})
+        else:
+            all_values = self._fetch_data_values(site_code, variable_type, filters)
+            site_and_variable = (
+                self._prepare_site_and_variable(all_values[0], site_code, variable_type) if all_values else None
+            )
+
+        if columnar:
+            return legacy_values_to_columns(all_values, **(site_and_variable or {}))
+
+        if not all_values:
+            return []
+
+        return_data = dict(site_and_variable)
+        return_data['data_values'] = self._map_timed(
+            'prepare_data_values',
+            self._prepare_data_value_records if as_records else self._prepare_data_values,
+            all_values,
+        )
 
         return return_data
 
+    def _fetch_data_values(self, site_code, variable_type, filters=None):
+        filters_ = self._build_data_value_filters(site_code, variable_type, filters)
+        return self._get_all_pages(
+            self._call_get_data_values(filters_, page_size=1000),
+            max_workers=self.max_workers,
+        )
+
+    def _sync_cached_data_values(self, site_code, variable_type, filters):
+        def _fetch(time_filters):
+            values = self._fetch_data_values(site_code, variable_type, time_filters)
+            rows = [
+                (
+                    value['dateTimeUtc'],
+                    value['localDateTime'],
+                    {
+                        'dataValue': value['dataValue'],
+                        'localDateTime': value['localDateTime'],
+                        'dateTimeUtc': value['dateTimeUtc'],
+                    },
+                )
+                for value in values
+            ]
+            metadata = self._prepare_site_and_variable(values[0], site_code, variable_type) if values else None
+            return rows, metadata
+
+        return self._sync_cache(site_code, variable_type, filters, _fetch, utc_datetime)
+
+    def _chunk_site_codes(self, site_codes, params, max_url_length):
+        """Split site codes into chunks whose data values request URL stays below max_url_length."""
+        # host, path, query of the remaining filters and the pagination parameters
+        base_length = len(self.host) + len('/data_values?') + len(urlencode(params, doseq=True)) + 50
+
+        chunks, chunk, chunk_length = [], [], base_length
+        for site_code in site_codes:
+            site_code_length = len('&site_codes=') + len(quote(str(site_code)))
+            if chunk and chunk_length + site_code_length > max_url_length:
+                chunks.append(chunk)
+                chunk, chunk_length = [], base_length
+            chunk.append(site_code)
+            chunk_length += site_code_length
+
+        if chunk:
+            chunks.append(chunk)
+
+        return chunks
+
+    def get_data_values_for_sites(
+            self,
+            site_codes,
+            variable_types,
+            filters=None,
+            max_url_length=DEFAULT_MAX_URL_LENGTH,
+    ):
+        """
+        Get data values for many sites and variables with as few requests as possible.
+
+        Sites are packed into the `site_codes` filter of each request, split into chunks so that
+        request URLs stay below max_url_length, and the values are split per site and variable.
+
+        Args:
+            site_codes: List of site codes
+            variable_types: List of keys of `variable_variable_code_map`
+            filters: Additional data value filters
+            max_url_length: Maximum length of a request URL
+
+        Returns:
+            Dict keyed by site code and variable type holding the same data as
+            `get_data_values_for_site` (an empty list when there are no values)
+        """
+        variable_types_by_code = {
+            variable_variable_code_map[variable_type]: variable_type for variable_type in variable_types
+        }
+        params = GetDataValueFilters(
+            variable_codes=list(variable_types_by_code),
+            include_meteo=True,
+            data_value__is_no_data_value=False,
+        )
+        if filters:
+            params.update(filters)
+
+        values_by_series = {}
+        for chunk in self._chunk_site_codes(site_codes, params, max_url_length):
+            chunk_values = self._get_all_pages(
+                self._call_get_data_values({**params, 'site_codes': chunk}, page_size=1000),
+                max_workers=self.max_workers,
+            )
+            for value in chunk_values:
+                series = (str(value['site']['siteCode']), value['variable']['variablecode'])
+                values_by_series.setdefault(series, []).append(value)
+
+        data = {}
+        for site_code in site_codes:
+            data[site_code] = {}
+            for variable_code, variable_type in variable_types_by_code.items():
+                values = values_by_series.get((str(site_code), variable_code))
+                if not values:
+                    data[site_code][variable_type] = []
+                    continue
+
+                return_data = self._prepare_site_and_variable(values[0], site_code, variable_type)
+                return_data['data_values'] = self._map_timed('prepare_data_values', self._prepare_data_values, values)
+                data[site_code][variable_type] = return_data
+
+        return data
+
+    def iter_data_values_for_site(
+            self,
+            site_code,
+            variable_type,
+            filters=None,
+            page_size=1000,
+            prefetch=True,
+    ):
+        """
+        Lazily yield prepared data values for a site, one page at a time.
+
+        Unlike `get_data_values_for_site`, only the current page (and, with prefetch,
+        the next one) is kept in memory, so long histories can be exported in
+        constant memory. Site and variable details are not included in the yielded
+        values.
+
+        Args:
+            site_code: Site code
+            variable_type: Key of `variable_variable_code_map`
+            filters: Additional data value filters
+            page_size: Number of values requested per page
+            prefetch: If True, the next page is requested while the current one is consumed
+        """
+        filters_ = self._build_data_value_filters(site_code, variable_type, filters)
+        first_page = self._call_get_data_values(filters_, page_size=page_size)
+
+        for page in self._iter_pages(first_page, prefetch=prefetch):
+            for value in page:
+                yield self._prepare_data_value(value)
+
 
 class IEasyHydroHFSDK(IEasyHydroHFSDKEndpointsBase):
     @staticmethod
@@ -191,28 +398,27 @@ class IEasyHydroHFSDK(IEasyHydroHFSDKEndpointsBase):
 
         return response_data
 
-    def get_discharge_sites(self):
-        sites_response = self._call_get_discharge_sites()
-        if sites_response.status_code == 200:
-            return self.map_site_data(sites_response.json())
-        else:
-            raise ValueError(f"Could not retrieve discharge sites, got status code {sites_response.status_code}")
+    def _get_sites(self, site_kind, as_records=False):
+        # records copy what they take from the cached sites, so these are not copied for them
+        sites = self.site_catalog.get_mapped(
+            self._site_catalog_key(site_kind),
+            partial(self._fetch_site_listing, site_kind),
+            self._response_json,
+            lambda resources: self._map_timed('map_site_data', self.map_site_data, resources),
+            copy=not as_records,
+        )
+        return [Site.from_dict(site) for site in sites] if as_records else sites
 
-    def get_meteo_sites(self):
-        sites_response = self._call_get_meteo_sites()
-        if sites_response.status_code == 200:
-            return self.map_site_data(sites_response.json())
-        else:
-            raise ValueError(f"Could not retrieve meteo sites, got status code {sites_response.status_code}")
+    def get_discharge_sites(self, as_records=False):
+        return self._get_sites('discharge', as_records)
 
-    def get_virtual_sites(self):
-        sites_response = self._call_get_virtual_sites()
-        if sites_response.status_code == 200:
-            return self.map_site_data(sites_response.json())
-        else:
-            raise ValueError(f"Could not retrieve virtual sites, got status code {sites_response.status_code}")
+    def get_meteo_sites(self, as_records=False):
+        return self._get_sites('meteo', as_records)
 
-    def get_norm_for_site(self, site_code, norm_type, norm_period="d", automatic=False):
+    def get_virtual_sites(self, as_records=False):
+        return self._get_sites('virtual', as_records)
+
+    def get_norm_for_site(self, site_code, norm_type, norm_period="d", automatic=False, as_records=False):
         """
         Get norm data for a site.
         
@@ -221,6 +427,7 @@ class IEasyHydroHFSDK(IEasyHydroHFSDKEndpointsBase):
             norm_type: Type of norm ('discharge', 'water_level', 'precipitation', or 'temperature')
             norm_period: Period for norm data ('d' for daily, default)
             automatic: If True, get norms for automatic stations, if False for manual (default False)
+            as_records: If True, return a `Norm` record instead of a list of values
         """
         station_type = 'A' if automatic else 'M'
         
@@ -237,22 +444,140 @@ class IEasyHydroHFSDK(IEasyHydroHFSDKEndpointsBase):
                 raise ValueError(f"Can only retrieve discharge, water level, precipitation or temperature norms, got {norm_type}")
 
         if norm_response.status_code == 200:
-            return self._ensure_norm_data_has_correct_length(
-                [float(entry["value"]) for entry in norm_response.json()],
+            norm_data = self._ensure_norm_data_has_correct_length(
+                [float(entry["value"]) for entry in self._response_json(norm_response)],
                 norm_period
             )
+            if as_records:
+                return Norm(values=norm_data, site_code=site_code, norm_type=norm_type, norm_period=norm_period)
+            return norm_data
         else:
             raise ValueError(
                 f"Could not retrieve {norm_type} norm for site {site_code}, got status code {norm_response.status_code}"
             )
 
-    def get_data_values_for_site(self, filters: GetHFDataValuesFilters = None):
+    def get_norms_for_sites(self, site_codes, norm_types, norm_period="d", automatic=False, max_workers=None):
+        """
+        Get norm data for many sites and norm types at once.
+
+        Lookups run concurrently and share the cached station index. A failing lookup
+        does not abort the others, its error message is returned instead.
+
+        Args:
+            site_codes: List of station codes
+            norm_types: List of norm types ('discharge', 'water_level', 'precipitation', 'temperature')
+            norm_period: Period for norm data ('d' for daily, default)
+            automatic: If True, get norms for automatic stations, if False for manual (default False)
+            max_workers: Number of concurrent lookups, defaults to the SDK `max_workers`
+
+        Returns:
+            Dict keyed by site code and norm type, e.g.
+            {'15054': {'discharge': {'norm_data': [...], 'error': None}}}
+        """
+        site_types = {
+            'hydro' if norm_type in ('discharge', 'water_level') else 'meteo'
+            for norm_type in norm_types
+        }
+        for site_type in site_types:
+            try:
+                self._ensure_station_index(site_type)
+            except Exception:
+                # every lookup falls back to resolving its station directly
+                pass
+
+        def _get_norm(site_code, norm_type):
+            try:
+                return {
+                    'norm_data': self.get_norm_for_site(site_code, norm_type, norm_period, automatic),
+                    'error': None,
+                }
+            except Exception as exc:
+                return {'norm_data': None, 'error': str(exc)}
+
+        lookups = [(site_code, norm_type) for site_code in site_codes for norm_type in norm_types]
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as executor:
+            results = executor.map(lambda lookup: _get_norm(*lookup), lookups)
+
+            norms = {site_code: {} for site_code in site_codes}
+            for (site_code, norm_type), result in zip(lookups, results):
+                norms[site_code][norm_type] = result
+
+        return norms
+
+    def _prepare_data_values_filters(self, filters):
         filters = {
             'view_type': 'measurements',
             'display_type': 'individual',
-            **filters
+            **(filters or {})
         }
-        api_filters = self._map_filters(filters) if filters else {}
+        return self._map_filters(filters)
+
+    def get_data_values_for_site(
+            self,
+            filters: GetHFDataValuesFilters = None,
+            all_pages=False,
+            max_in_flight=None,
+            columnar=False,
+            shard=None,
+            view_type=None,
+            display_type=None,
+    ):
+        """
+        Get data values for the given filters.
+
+        Args:
+            filters: Data value filters
+            all_pages: If True, all pages are fetched (concurrently, see `iter_data_values_for_site`)
+                and returned as a single response with all results
+            max_in_flight: Maximum number of concurrently requested pages when all_pages is True,
+                or of concurrently fetched shards when shard is set
+            columnar: If True, return the results as a list of `DataValueColumns` with numpy
+                arrays, one per station and variable (requires numpy)
+            shard: 'year', 'month' or a `timedelta`. Splits the time window of the filters into
+                shards of this length which are fetched in parallel and merged in order, implies
+                all_pages. Long windows are otherwise served as one deeply paginated listing.
+            view_type: View type of the server, 'measurements' by default
+            display_type: Display type of the server, 'individual' (every measurement) by default.
+                Aggregated view and display types let the server reduce the data instead of
+                transferring every measurement, see also `ieasyhydro_sdk.resampling`
+
+        With a configured `cache` and filters consisting of `site_codes`, `variable_names` and
+        time filters, only values missing from the cache are requested (one request series per
+        station and variable) and all results are served from the cache.
+        """
+        filters = self._with_view(filters, view_type, display_type)
+        if self.cache is not None and self._is_cacheable(filters):
+            response_data = self._get_cached_data_values(filters)
+            if columnar:
+                return hf_results_to_columns(response_data['results'])
+            return response_data
+
+        if shard is not None:
+            results = self._merge_shard_results(self._iter_shard_results(filters, shard, max_in_flight))
+            if columnar:
+                return hf_results_to_columns(results)
+            return {
+                'count': len(results),
+                'next': None,
+                'previous': None,
+                'results': results,
+            }
+
+        api_filters = self._prepare_data_values_filters(filters)
+
+        if all_pages:
+            results = []
+            for page_results in self._iter_data_values_pages(api_filters, max_in_flight):
+                results += page_results
+            if columnar:
+                return hf_results_to_columns(results)
+            return {
+                'count': len(results),
+                'next': None,
+                'previous': None,
+                'results': results,
+            }
+
         response = self._call_get_data_values_for_site(filters=api_filters)
         if not response or response.status_code != 200:
             return {
@@ -260,4 +585,188 @@ class IEasyHydroHFSDK(IEasyHydroHFSDKEndpointsBase):
                 'text': response.text
             }
 
-        return response.json()
+        if columnar:
+            return hf_results_to_columns(self._response_json(response)['results'])
+
+        return self._response_json(response)
+
+    def _iter_shard_results(self, filters, shard, max_in_flight=None):
+        """Yield the results of every time shard of the filters in chronological order.
+
+        Up to `max_in_flight` shards are fetched concurrently, each one page after the other.
+        Values repeated at a shard boundary (same station, variable and UTC timestamp as in the
+        previous shard) are dropped.
+        """
+        shards = iter(shard_filters(filters or {}, shard))
+        max_in_flight = max_in_flight or self.max_workers
+
+        def _fetch(shard_filters_):
+            api_filters = self._prepare_data_values_filters(shard_filters_)
+            results = []
+            for page_results in self._iter_data_values_pages(api_filters, max_in_flight=1):
+                results += page_results
+            return results
+
+        previous_keys = set()
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            in_flight = deque(
+                executor.submit(_fetch, shard_filters_) for shard_filters_ in islice(shards, max_in_flight)
+            )
+            while in_flight:
+                results = in_flight.popleft().result()
+                next_shard = next(shards, None)
+                if next_shard is not None:
+                    in_flight.append(executor.submit(_fetch, next_shard))
+
+                keys = set()
+                deduplicated = []
+                for station in results:
+                    data = []
+                    for variable_data in station.get('data', []):
+                        series = (station.get('station_code'), variable_data.get('variable_code'))
+                        values = []
+                        for value in variable_data.get('values', []):
+                            key = series + (value['timestamp_utc'],)
+                            keys.add(key)
+                            if key not in previous_keys:
+                                values.append(value)
+                        data.append(dict(variable_data, values=values))
+                    deduplicated.append(dict(station, data=data))
+                previous_keys = keys
+                yield deduplicated
+
+    @staticmethod
+    def _merge_shard_results(shard_results):
+        """Merge the results of consecutive shards into one result per station."""
+        stations = {}
+        for results in shard_results:
+            for station in results:
+                merged = stations.get(station.get('station_code'))
+                if merged is None:
+                    stations[station.get('station_code')] = dict(
+                        station, data=[dict(variable_data) for variable_data in station.get('data', [])]
+                    )
+                    continue
+                merged_data = {variable_data['variable_code']: variable_data for variable_data in merged['data']}
+                for variable_data in station.get('data', []):
+                    existing = merged_data.get(variable_data.get('variable_code'))
+                    if existing is None:
+                        merged['data'].append(dict(variable_data))
+                    else:
+                        # value lists are built per shard by `_iter_shard_results`, extending them is safe
+                        existing['values'].extend(variable_data['values'])
+        return list(stations.values())
+
+    @staticmethod
+    def _with_view(filters, view_type, display_type):
+        # the cache only holds individual measurements, filters with a view are never cached
+        if view_type is None and display_type is None:
+            return filters
+        filters = dict(filters or {})
+        if view_type is not None:
+            filters['view_type'] = view_type
+        if display_type is not None:
+            filters['display_type'] = display_type
+        return filters
+
+    @staticmethod
+    def _is_cacheable(filters):
+        if not filters or not filters.get('site_codes') or not filters.get('variable_names'):
+            return False
+        return all(
+            name in TIME_FILTERS or name in ('site_codes', 'variable_names', 'page', 'page_size')
+            for name in filters
+        )
+
+    def _get_cached_data_values(self, filters):
+        time_filters = {name: value for name, value in filters.items() if name in TIME_FILTERS}
+        series = [
+            (site_code, variable_name)
+            for site_code in filters['site_codes']
+            for variable_name in filters['variable_names']
+        ]
+
+        def _sync(site_code, variable_name):
+            def _fetch(delta_filters):
+                api_filters = self._prepare_data_values_filters({
+                    'site_codes': [site_code],
+                    'variable_names': [variable_name],
+                    **delta_filters,
+                })
+                rows, metadata = [], None
+                for page_results in self._iter_data_values_pages(api_filters):
+                    for station in page_results:
+                        for variable_data in station.get('data', []):
+                            if variable_data.get('variable_code') != variable_name:
+                                continue
+                            metadata = {key: value for key, value in station.items() if key != 'data'}
+                            metadata['unit'] = variable_data.get('unit')
+                            rows += [
+                                (to_timestamp(value['timestamp_utc']), to_timestamp(value['timestamp_local']), value)
+                                for value in variable_data.get('values', [])
+                            ]
+                return rows, metadata
+
+            return self._sync_cache(
+                site_code, variable_name, time_filters, _fetch,
+                lambda timestamp: datetime.fromtimestamp(timestamp, timezone.utc).isoformat(),
+            )
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            synced = list(executor.map(lambda pair: _sync(*pair), series))
+
+        stations = {}
+        for (site_code, variable_name), (values, metadata) in zip(series, synced):
+            if metadata is None:
+                # the station was never returned by the API
+                continue
+            station = stations.get(site_code)
+            if station is None:
+                station = {key: value for key, value in metadata.items() if key != 'unit'}
+                station['data'] = []
+                stations[site_code] = station
+            station['data'].append({
+                'variable_code': variable_name,
+                'unit': metadata['unit'],
+                'values': values,
+            })
+
+        results = list(stations.values())
+        return {
+            'count': len(results),
+            'next': None,
+            'previous': None,
+            'results': results,
+        }
+
+    def iter_data_values_for_site(
+            self,
+            filters: GetHFDataValuesFilters = None,
+            max_in_flight=None,
+            shard=None,
+            view_type=None,
+            display_type=None,
+    ):
+        """
+        Yield the results of all pages for the given filters, in order.
+
+        The number of pages is learned from the first response and up to `max_in_flight`
+        upcoming pages are prefetched concurrently while the current one is consumed.
+
+        Args:
+            filters: Data value filters, `page_size` sets the page size and `page` the first page
+            max_in_flight: Maximum number of concurrently requested pages, defaults to `max_workers`
+            shard: 'year', 'month' or a `timedelta`, see `get_data_values_for_site`. Shards are
+                yielded in order, so a station is yielded once per shard it has values in.
+            view_type: View type of the server, see `get_data_values_for_site`
+            display_type: Display type of the server, see `get_data_values_for_site`
+        """
+        filters = self._with_view(filters, view_type, display_type)
+        if shard is not None:
+            for results in self._iter_shard_results(filters, shard, max_in_flight):
+                yield from results
+            return
+
+        api_filters = self._prepare_data_values_filters(filters)
+        for page_results in self._iter_data_values_pages(api_filters, max_in_flight):
+            yield from page_results
@@ -1,12 +1,43 @@
 
+import base64
+import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
 
-import requests
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+from ieasyhydro_sdk.cache import DataValuesCache
+from ieasyhydro_sdk.coalescing import RequestCoalescer
+from ieasyhydro_sdk.catalog import DEFAULT_SITE_CATALOG_TTL, SiteCatalog
+from ieasyhydro_sdk.instrumentation import logger
+from ieasyhydro_sdk.transport import CONNECTION_ERRORS, SessionTransport
+from ieasyhydro_sdk.throttling import (
+    AdaptiveRateLimiter,
+    IDEMPOTENT_METHODS,
+    RETRY_STATUS_CODES,
+    backoff_delay,
+    parse_retry_after,
+)
+
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_TIMEOUT = (10, 120)
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_TOKEN_REFRESH_MARGIN = 60
 
 
 class IEasyHydroSDKBase:
+    # configuration is read from <prefix>_HOST, <prefix>_USERNAME and <prefix>_PASSWORD
+    environment_prefix = 'IEASYHYDRO'
+    default_host = 'https://api.ieasyhydro.org'
 
     def __init__(
             self,
@@ -14,30 +45,103 @@ class IEasyHydroSDKBase:
             username=None,
             password=None,
             organization_id=None,
+            pool_size=DEFAULT_POOL_SIZE,
+            max_retries=DEFAULT_MAX_RETRIES,
+            timeout=DEFAULT_TIMEOUT,
+            max_workers=DEFAULT_MAX_WORKERS,
+            rate_limit=None,
+            max_concurrency=None,
+            cache=None,
+            site_catalog_ttl=DEFAULT_SITE_CATALOG_TTL,
+            site_catalog_dir=None,
+            instrumentation=None,
+            transport=None,
+            coalesce=False,
     ):
-        self.host = host or os.environ.get('IEASYHYDRO_HOST', 'https://api.ieasyhydro.org')
-        self.username = username or os.environ.get('IEASYHYDRO_USERNAME')
-        self.password = password or os.environ.get('IEASYHYDRO_PASSWORD')
-        self.organization_id = organization_id or os.environ.get('ORGANIZATION_ID')
+        self._configure_credentials(host, username, password, organization_id)
         self.bearer_token = None
+        self.max_workers = max_workers
+        self.cache = DataValuesCache(cache) if isinstance(cache, (str, os.PathLike)) else cache
+        self.site_catalog = SiteCatalog(site_catalog_ttl, site_catalog_dir)
+        self.instrumentation = instrumentation
+        self.site_catalog.instrumentation = instrumentation
+        self.coalescer = RequestCoalescer() if coalesce is True else coalesce or None
+        if self.coalescer is not None:
+            self.coalescer.instrumentation = instrumentation
+
+        self._configure_session(pool_size, max_retries, timeout, rate_limit, max_concurrency, transport)
+
+    def _configure_credentials(self, host, username, password, organization_id):
+        """Resolve the connection settings, falling back to the environment variables.
 
-        for name, env_name in (
-                ('host', 'IEASYHYDRO_HOST'),
-                ('username', 'IEASYHYDRO_USERNAME'),
-                ('password', 'IEASYHYDRO_PASSWORD'),
-        ):
+        Args:
+            host: API host, defaults to <prefix>_HOST or `default_host`
+            username: Defaults to <prefix>_USERNAME
+            password: Defaults to <prefix>_PASSWORD
+            organization_id: Defaults to ORGANIZATION_ID
+        """
+        self.host = host or os.environ.get(f'{self.environment_prefix}_HOST', self.default_host)
+        self.username = username or os.environ.get(f'{self.environment_prefix}_USERNAME')
+        self.password = password or os.environ.get(f'{self.environment_prefix}_PASSWORD')
+        self.organization_id = organization_id or os.environ.get('ORGANIZATION_ID')
+
+        for name in ('host', 'username', 'password'):
             if getattr(self, name) is None:
                 raise ValueError(
                     f'The {name} is not set. Either provide "{name}" parameter in class '
-                    f'initialization or set the "{env_name}" environment variable.')
+                    f'initialization or set the "{self.environment_prefix}_{name.upper()}" environment variable.')
+
+    def _configure_session(
+            self, pool_size, max_retries, timeout, rate_limit=None, max_concurrency=None, transport=None,
+    ):
+        """Create the transport and the request scheduler shared by all requests of this client.
+
+        Args:
+            pool_size: Number of connections kept open per host
+            max_retries: How many times idempotent requests are retried on connection
+                errors, 429 and 5xx responses, with exponential backoff and jitter
+            timeout: Request timeout in seconds, either a single value or a
+                (connect, read) tuple
+            rate_limit: Maximum requests per second, None for no rate limit
+            max_concurrency: Maximum concurrent requests, defaults to pool_size
+            transport: Transport sending the requests (see `ieasyhydro_sdk.transport`),
+                a keep-alive `SessionTransport` by default
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.rate_limiter = AdaptiveRateLimiter(
+            rate=rate_limit,
+            max_concurrency=max_concurrency or pool_size,
+        )
+        self.transport = transport or SessionTransport(pool_size)
+
+    def close(self):
+        self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _site_catalog_key(self, site_kind):
+        return f'{self.host}|{self.username}|{self.organization_id}|{site_kind}'
+
+    def invalidate_site_catalog(self):
+        """Drop the cached station listings so the next site lookup fetches them again."""
+        self.site_catalog.invalidate()
+        if self.coalescer is not None:
+            self.coalescer.clear()
 
     def _login(self):
-        print("sending login request")
-        response = requests.post(
-            url=urljoin(self.host, 'access_tokens'),
-            json={'usernameOrEmail': self.username, 'password': self.password}
+        logger.debug('sending login request')
+        response = self.transport.request(
+            'post',
+            urljoin(self.host, 'access_tokens'),
+            json={'usernameOrEmail': self.username, 'password': self.password},
+            timeout=self.timeout,
         )
-        print("login response", response.json())
+        logger.debug('login response status %s', response.status_code)
 
         if response.status_code == 201:
             token = response.json()['resources'][0]['tokenString']
@@ -46,6 +150,86 @@ class IEasyHydroSDKBase:
         elif response.status_code == 400 and response.json()['errorCode'] == "11001":
             raise ValueError('Configured username and password are not valid.')
 
+    def _ensure_authenticated(self):
+        if not self.bearer_token:
+            self._login()
+
+    def _invalidate_token(self, token):
+        if self.bearer_token == token:
+            self.bearer_token = None
+
+    def export_auth_state(self):
+        """Return the authentication state, which `import_auth_state` of another client
+        (e.g. in a worker process) can reuse instead of logging in again."""
+        self._ensure_authenticated()
+        return {'bearer_token': self.bearer_token}
+
+    def import_auth_state(self, state):
+        self.bearer_token = state['bearer_token']
+
+    def _send_request(self, method, relative_url, headers, json_body, params):
+        """Send a request through the rate limiter.
+
+        Idempotent requests are retried up to `max_retries` times on connection errors, 429
+        and 5xx responses, after the server's Retry-After or an exponential backoff with
+        jitter. A request rejected with 401 is sent once more with a renewed token.
+        """
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempt = 0
+        reauthenticated = False
+        while True:
+            self._ensure_authenticated()
+            token = self.bearer_token
+            retry_after = None
+            error = None
+            with self.rate_limiter.slot() as outcome:
+                if self.instrumentation is not None:
+                    started_at = time.perf_counter()
+                try:
+                    response = self.transport.request(
+                        method,
+                        urljoin(self.host, relative_url),
+                        headers={**headers, 'Authorization': f'Bearer {token}'},
+                        json=json_body,
+                        params=params,
+                        timeout=self.timeout,
+                    )
+                except getattr(self.transport, 'connection_errors', CONNECTION_ERRORS) as exc:
+                    if self.instrumentation is not None:
+                        self.instrumentation.request(method, relative_url, None, time.perf_counter() - started_at, 0)
+                    if not idempotent or attempt >= self.max_retries:
+                        raise
+                    response = None
+                    error = type(exc).__name__
+                else:
+                    if self.instrumentation is not None:
+                        self.instrumentation.request(
+                            method, relative_url, response.status_code,
+                            time.perf_counter() - started_at, len(response.content),
+                        )
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    outcome['status_code'] = response.status_code
+                    outcome['retry_after'] = retry_after
+
+            if response is not None and response.status_code == 401 and not reauthenticated:
+                reauthenticated = True
+                self._invalidate_token(token)
+                continue
+
+            if response is not None and (
+                    response.status_code not in RETRY_STATUS_CODES
+                    or not idempotent
+                    or attempt >= self.max_retries
+            ):
+                return response
+
+            attempt += 1
+            if self.instrumentation is not None:
+                self.instrumentation.retry(method, relative_url, attempt, error or response.status_code)
+            # with Retry-After the rate limiter already holds requests back long enough
+            if not retry_after:
+                time.sleep(backoff_delay(attempt - 1))
+
     def _call_api(
             self,
             method,
@@ -57,16 +241,13 @@ class IEasyHydroSDKBase:
             offset=0,
             page_size=100,
     ):
-        if not self.bearer_token:
-            self._login()
-
         if relative_url is None:
             raise ValueError('No path provided or the provided path is None')
 
-        headers = headers or {}
-        headers.update({'Authorization': f'Bearer {self.bearer_token}'})
+        # copied so that pages fetched concurrently never share a mutable dict
+        headers = dict(headers or {})
 
-        params = params or {}
+        params = dict(params or {})
         if paginated_endpoint:
             params.update({
                 'offset': offset,
@@ -75,18 +256,19 @@ class IEasyHydroSDKBase:
 
         if self.organization_id:
             headers.update({'organization': str(self.organization_id)})
-        response = requests.request(
-            method=method,
-            url=urljoin(self.host, relative_url),
-            headers=headers,
-            json=json_body,
-            params=params,
-        )
+
+        if self.coalescer is not None and method.upper() in IDEMPOTENT_METHODS and json_body is None:
+            response = self.coalescer.get(
+                self.coalescer.key(method, relative_url, headers, params),
+                partial(self._send_request, method, relative_url, headers, json_body, params),
+            )
+        else:
+            response = self._send_request(method, relative_url, headers, json_body, params)
 
         if not paginated_endpoint:
             return response
 
-        response_json = response.json()
+        response_json = self._response_json(response)
 
         offset = response_json['offset']
         count = response_json['count']
@@ -117,47 +299,273 @@ class IEasyHydroSDKBase:
         )
         response.next_page = next_page_fn
         response.prev_page = prev_page_fn
+        response.count = count
+        response.offset = offset
+        response.page_length = len(resources)
+        response.get_page = partial(
+            self._call_api,
+            method=method,
+            relative_url=relative_url,
+            headers=headers,
+            json_body=json_body,
+            params=params,
+            page_size=page_size,
+        )
         return response
 
-    @staticmethod
-    def _get_all_pages(response, resources_key='resources'):
-        data = response.json()[resources_key]
-        while response.has_next_page:
-            response = response.next_page()
-            data += response.json()[resources_key]
+    def _response_json(self, response):
+        """Decode the JSON body of a response, once.
+
+        The decoded body is kept on the response so the pagination code and the callers
+        share it. orjson is used when it is installed.
+        """
+        try:
+            return response.decoded_json
+        except AttributeError:
+            pass
+
+        if self.instrumentation is not None:
+            started_at = time.perf_counter()
+        response.decoded_json = orjson.loads(response.content) if orjson else json.loads(response.content)
+        if self.instrumentation is not None:
+            self.instrumentation.json_decoded(
+                urlsplit(response.url).path, time.perf_counter() - started_at, len(response.content)
+            )
+        return response.decoded_json
+
+    def _get_all_pages(self, response, resources_key='resources', max_workers=1):
+        """Collect the resources of all pages, starting from the given paginated response.
+
+        With max_workers > 1 the remaining offsets are derived from the `count` of the
+        first response and fetched concurrently; results are kept in page order.
+        """
+        data = list(self._response_json(response)[resources_key])
+        page_count = 1
+        if not response.has_next_page:
+            pass
+        elif max_workers <= 1:
+            while response.has_next_page:
+                response = response.next_page()
+                data += self._response_json(response)[resources_key]
+                page_count += 1
+        else:
+            # the server may cap the requested page size, so step by what it actually returned
+            step = response.page_length
+            offsets = range(response.offset + step, response.count, step)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for page in executor.map(lambda page_offset: response.get_page(offset=page_offset), offsets):
+                    data += self._response_json(page)[resources_key]
+                    page_count += 1
+
+        if self.instrumentation is not None:
+            self.instrumentation.pages(urlsplit(response.url).path, page_count)
 
         return data
 
+    def _cache_namespace(self):
+        # the same station code can exist in several organizations of one server
+        return f'{self.host}|{self.organization_id}'
+
+    def _sync_cache(self, site_code, variable, filters, fetch, to_filter_value):
+        """Sync a series through `DataValuesCache.sync`, reporting whether the API was queried."""
+        namespace = self._cache_namespace()
+        if self.instrumentation is None:
+            return self.cache.sync(namespace, site_code, variable, filters, fetch, to_filter_value)
+
+        fetched = []
+
+        def _fetch(time_filters):
+            fetched.append(time_filters)
+            return fetch(time_filters)
+
+        result = self.cache.sync(namespace, site_code, variable, filters, _fetch, to_filter_value)
+        self.instrumentation.cache('data_values', not fetched)
+        return result
+
+    def _map_timed(self, name, mapper, data):
+        """Call mapper(data), reporting the mapping time when instrumented."""
+        if self.instrumentation is None:
+            return mapper(data)
+
+        started_at = time.perf_counter()
+        mapped = mapper(data)
+        self.instrumentation.mapping(name, time.perf_counter() - started_at, len(mapped))
+        return mapped
+
+    def _iter_pages(self, response, resources_key='resources', prefetch=False):
+        """Yield the resources of each page, starting from the given paginated response.
+
+        Pages are requested lazily, only one page is held at a time. With prefetch the
+        next page is requested in the background while the current one is consumed.
+        """
+        if not prefetch:
+            while True:
+                yield self._response_json(response)[resources_key]
+                if not response.has_next_page:
+                    return
+                response = response.next_page()
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            while True:
+                next_page = executor.submit(response.next_page) if response.has_next_page else None
+                yield self._response_json(response)[resources_key]
+                if next_page is None:
+                    return
+                response = next_page.result()
+
 
 class IEasyHydroHFSDKBase(IEasyHydroSDKBase):
-    def __init__(self, host=None, username=None, password=None, organization_id=None):
-        self.host = host or os.environ.get('IEASYHYDROHF_HOST', 'https://hf.ieasyhydro.org/api/v1/')
-        self.username = username or os.environ.get('IEASYHYDROHF_USERNAME')
-        self.password = password or os.environ.get('IEASYHYDROHF_PASSWORD')
-        self.organization_id = organization_id or os.environ.get('ORGANIZATION_ID')
-        self.organization_uuid = None
-        self.bearer_token = None
+    environment_prefix = 'IEASYHYDROHF'
+    default_host = 'https://hf.ieasyhydro.org/api/v1/'
 
-        for name, env_name in (
-                ('host', 'IEASYHYDROHF_HOST'),
-                ('username', 'IEASYHYDROHF_USERNAME'),
-                ('password', 'IEASYHYDROHF_PASSWORD'),
-        ):
-            if getattr(self, name) is None:
-                raise ValueError(
-                    f'The {name} is not set. Either provide "{name}" parameter in class '
-                    f'initialization or set the "{env_name}" environment variable.')
+    def __init__(
+            self,
+            host=None,
+            username=None,
+            password=None,
+            organization_id=None,
+            pool_size=DEFAULT_POOL_SIZE,
+            max_retries=DEFAULT_MAX_RETRIES,
+            timeout=DEFAULT_TIMEOUT,
+            max_workers=DEFAULT_MAX_WORKERS,
+            rate_limit=None,
+            max_concurrency=None,
+            cache=None,
+            site_catalog_ttl=DEFAULT_SITE_CATALOG_TTL,
+            site_catalog_dir=None,
+            instrumentation=None,
+            lazy_login=True,
+            token_refresh_margin=DEFAULT_TOKEN_REFRESH_MARGIN,
+            transport=None,
+            coalesce=False,
+    ):
+        self._organization_uuid = None
+        self.refresh_token = None
+        self.token_expires_at = None
+        self.token_refresh_margin = token_refresh_margin
+        self._auth_lock = threading.Lock()
+        self._station_index = {}
+        self._station_index_listings = {}
+        self._station_index_lock = threading.Lock()
+
+        super().__init__(
+            host=host,
+            username=username,
+            password=password,
+            organization_id=organization_id,
+            pool_size=pool_size,
+            max_retries=max_retries,
+            timeout=timeout,
+            max_workers=max_workers,
+            rate_limit=rate_limit,
+            max_concurrency=max_concurrency,
+            cache=cache,
+            site_catalog_ttl=site_catalog_ttl,
+            site_catalog_dir=site_catalog_dir,
+            instrumentation=instrumentation,
+            transport=transport,
+            coalesce=coalesce,
+        )
+        if not lazy_login:
+            self._login()
+
+    @property
+    def organization_uuid(self):
+        # with lazy login the organization is only known after the first authentication
+        if self._organization_uuid is None:
+            self._ensure_authenticated()
+        return self._organization_uuid
+
+    def _cache_namespace(self):
+        return f'{self.host}|{self.organization_uuid}'
 
-        self._login()
+    @staticmethod
+    def _get_token_expiry(token):
+        """Read the `exp` claim of a JWT access token, None if it cannot be read."""
+        try:
+            payload = token.split('.')[1]
+            payload += '=' * (-len(payload) % 4)
+            return json.loads(base64.urlsafe_b64decode(payload))['exp']
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+            return None
+
+    def _set_access_token(self, access_token):
+        self.bearer_token = access_token
+        self.token_expires_at = self._get_token_expiry(access_token)
 
     def _login(self):
-        response = requests.post(
-            url=urljoin(self.host, 'auth/token-obtain'),
-            json={'username': self.username, 'password': self.password}
+        response = self.transport.request(
+            'post',
+            urljoin(self.host, 'auth/token-obtain'),
+            json={'username': self.username, 'password': self.password},
+            timeout=self.timeout,
         )
         if response.status_code == 200:
             response_json = response.json()
-            self.bearer_token = response_json["access"]
-            self.organization_uuid = response_json["user"]["organization"]["uuid"]
+            self._set_access_token(response_json["access"])
+            self.refresh_token = response_json.get("refresh")
+            self._organization_uuid = response_json["user"]["organization"]["uuid"]
         else:
             raise ValueError('Configured username and password are not valid.')
+
+    def _refresh_access_token(self):
+        """Obtain a new access token with the refresh token, returns False if that is not possible."""
+        response = self.transport.request(
+            'post',
+            urljoin(self.host, 'auth/token-refresh'),
+            json={'refresh': self.refresh_token},
+            timeout=self.timeout,
+        )
+        if response.status_code != 200:
+            self.refresh_token = None
+            return False
+
+        response_json = response.json()
+        self._set_access_token(response_json["access"])
+        # the server may rotate refresh tokens
+        self.refresh_token = response_json.get("refresh", self.refresh_token)
+        return True
+
+    def _has_valid_token(self):
+        if not self.bearer_token:
+            return False
+        if self.token_expires_at is None:
+            return True
+        return time.time() < self.token_expires_at - self.token_refresh_margin
+
+    def _ensure_authenticated(self):
+        """Log in or refresh the access token ahead of its expiry.
+
+        Only one thread renews the token, the others wait for it and reuse the new token.
+        """
+        if self._has_valid_token():
+            return
+
+        with self._auth_lock:
+            if self._has_valid_token():
+                return
+            if not (self.refresh_token and self._refresh_access_token()):
+                self._login()
+
+    def _invalidate_token(self, token):
+        with self._auth_lock:
+            if self.bearer_token == token:
+                self.bearer_token = None
+
+    def export_auth_state(self):
+        """Return the authentication state, which `import_auth_state` of another client
+        (e.g. in a worker process) can reuse instead of logging in again."""
+        self._ensure_authenticated()
+        return {
+            'bearer_token': self.bearer_token,
+            'refresh_token': self.refresh_token,
+            'token_expires_at': self.token_expires_at,
+            'organization_uuid': self._organization_uuid,
+        }
+
+    def import_auth_state(self, state):
+        with self._auth_lock:
+            self.bearer_token = state['bearer_token']
+            self.refresh_token = state.get('refresh_token')
+            self.token_expires_at = state.get('token_expires_at')
+            self._organization_uuid = state.get('organization_uuid')
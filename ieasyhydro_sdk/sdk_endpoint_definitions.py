@@ -1,7 +1,18 @@
+import math
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
 from typing import Optional
 
 from ieasyhydro_sdk.sdk_base import IEasyHydroSDKBase, IEasyHydroHFSDKBase
 from ieasyhydro_sdk.filters import GetDataValueFilters, GetHFDataValuesFilters
+from ieasyhydro_sdk.instrumentation import logger
+
+
+STATION_INDEX_ANY_TYPE = '*'
+# site catalog listing each site type of the station index is built from
+STATION_INDEX_SITE_KINDS = {'hydro': 'discharge', 'meteo': 'meteo', 'virtual': 'virtual'}
 
 
 class IEasyHydroSDKEndpointsBase(IEasyHydroSDKBase):
@@ -40,22 +51,24 @@ class IEasyHydroSDKEndpointsBase(IEasyHydroSDKBase):
             params=filters
         )
 
-    def _call_get_discharge_sites(self, paginate=False, params=None):
+    def _call_get_discharge_sites(self, paginate=False, params=None, headers=None):
         method = 'get'
         path = '/discharge_sites'
         return self._call_api(
             method,
             path,
+            headers=headers,
             paginated_endpoint=paginate,
             params=params
         )
 
-    def _call_get_meteo_sites(self, paginate=False, params=None):
+    def _call_get_meteo_sites(self, paginate=False, params=None, headers=None):
         method = 'get'
         path = '/meteo_sites'
         return self._call_api(
             method,
             path,
+            headers=headers,
             paginated_endpoint=paginate,
             params=params,
         )
@@ -87,9 +100,9 @@ class IEasyHydroHFSDKEndpointsBase(IEasyHydroHFSDKBase):
             method, path, params=params, paginated_endpoint=False
         )
 
-    def _get_site_uuid_for_site_code(self, site_code, site_type, station_type="M"):
-        """Get site UUID for a given site code and type.
-        
+    def _fetch_site_uuid_for_site_code(self, site_code, site_type, station_type="M"):
+        """Get site UUID for a given site code and type directly from the API.
+
         Args:
             site_code: Station code
             site_type: Type of site ('hydro' or 'meteo')
@@ -97,17 +110,103 @@ class IEasyHydroHFSDKEndpointsBase(IEasyHydroHFSDKBase):
         """
         site_response = self._call_get_site_for_site_code(site_code, site_type, station_type)
         if site_response.status_code == 200:
-            sites = site_response.json()
+            sites = self._response_json(site_response)
             # Filter by station type
             for site in sites:
                 if site.get('station_type') == station_type:
                     return site.get('uuid')
             # If no match with station_type, return first site's UUID as fallback
             if sites:
-                print(f"Warning: No site found with station_type={station_type}, using first available site")
+                logger.warning('No site found with station_type=%s, using first available site', station_type)
                 return sites[0].get('uuid')
         return None
 
+    def _fetch_site_listing(self, site_kind, headers=None):
+        """Request the station listing of a site kind ('discharge', 'meteo' or 'virtual'),
+        raising unless the server answered 200 or 304."""
+        call_get_sites = {
+            'discharge': self._call_get_discharge_sites,
+            'meteo': self._call_get_meteo_sites,
+            'virtual': self._call_get_virtual_sites,
+        }[site_kind]
+        sites_response = call_get_sites(headers=headers)
+        if sites_response.status_code not in (200, 304):
+            raise ValueError(
+                f"Could not retrieve {site_kind} sites, got status code {sites_response.status_code}"
+            )
+        return sites_response
+
+    def _get_site_listing(self, site_kind):
+        """Return the raw station listing of a site kind from the site catalog."""
+        return self.site_catalog.get(
+            self._site_catalog_key(site_kind),
+            partial(self._fetch_site_listing, site_kind),
+            self._response_json,
+        )
+
+    def _load_station_index(self, site_type, sites):
+        """Replace the station index entries of a site type with the given station listing."""
+        index = {}
+        for site in sites:
+            station_code = site.get('station_code')
+            index.setdefault((station_code, site_type, site.get('station_type')), site.get('uuid'))
+            # first listed station is used when the requested station type does not exist
+            index.setdefault((station_code, site_type, STATION_INDEX_ANY_TYPE), site.get('uuid'))
+
+        self._station_index = {
+            key: uuid for key, uuid in self._station_index.items() if key[1] != site_type
+        }
+        self._station_index.update(index)
+        self._station_index_listings[site_type] = sites
+
+    def _ensure_station_index(self, site_type):
+        # the index follows the site catalog listing, it is rebuilt whenever the catalog
+        # fetched a new listing
+        sites = self._get_site_listing(STATION_INDEX_SITE_KINDS[site_type])
+        with self._station_index_lock:
+            if self._station_index_listings.get(site_type) is not sites:
+                self._load_station_index(site_type, sites)
+
+    def invalidate_station_index(self, site_type=None):
+        """Drop the station code to UUID index and the station listings it was built from.
+
+        Args:
+            site_type: Only invalidate the given site type ('hydro', 'meteo' or 'virtual'),
+                all site types if None
+        """
+        site_types = list(STATION_INDEX_SITE_KINDS) if site_type is None else [site_type]
+        with self._station_index_lock:
+            for site_type_ in site_types:
+                self._station_index_listings.pop(site_type_, None)
+                self.site_catalog.invalidate(self._site_catalog_key(STATION_INDEX_SITE_KINDS[site_type_]))
+
+    def _get_site_uuid_for_site_code(self, site_code, site_type, station_type="M"):
+        """Get site UUID for a given site code and type.
+
+        UUIDs are resolved from an in-memory index built from the site catalog listing of the
+        site type and rebuilt whenever the catalog fetches a new listing. Stations missing from the
+        index (e.g. added after it was loaded) are looked up directly.
+
+        Args:
+            site_code: Station code
+            site_type: Type of site ('hydro' or 'meteo')
+            station_type: Type of station ('A' for automatic or 'M' for manual, default 'M')
+        """
+        if site_type not in ('hydro', 'meteo', 'virtual'):
+            return None
+
+        self._ensure_station_index(site_type)
+        site_uuid = self._station_index.get((site_code, site_type, station_type))
+        if not site_uuid:
+            site_uuid = self._station_index.get((site_code, site_type, STATION_INDEX_ANY_TYPE))
+            if site_uuid:
+                logger.warning('No site found with station_type=%s, using first available site', station_type)
+
+        if self.instrumentation is not None:
+            self.instrumentation.cache('station_index', bool(site_uuid))
+
+        return site_uuid or self._fetch_site_uuid_for_site_code(site_code, site_type, station_type)
+
     def _call_get_norm_for_site(
             self,
             site_code,
@@ -149,25 +248,25 @@ class IEasyHydroHFSDKEndpointsBase(IEasyHydroHFSDKBase):
             site_code, 'meteo', {"norm_type": norm_type, "norm_metric": norm_metric}, station_type
         )
 
-    def _call_get_discharge_sites(self, paginate=False, params=None):
+    def _call_get_discharge_sites(self, paginate=False, params=None, headers=None):
         method = 'get'
         path = f'stations/{self.organization_uuid}/hydrological'
         return self._call_api(
-            method, path, paginated_endpoint=paginate, params=params
+            method, path, headers=headers, paginated_endpoint=paginate, params=params
         )
 
-    def _call_get_meteo_sites(self, paginate=False, params=None):
+    def _call_get_meteo_sites(self, paginate=False, params=None, headers=None):
         method = 'get'
         path = f'stations/{self.organization_uuid}/meteo'
         return self._call_api(
-            method, path, paginated_endpoint=paginate, params=params
+            method, path, headers=headers, paginated_endpoint=paginate, params=params
         )
 
-    def _call_get_virtual_sites(self, paginate=False, params=None):
+    def _call_get_virtual_sites(self, paginate=False, params=None, headers=None):
         method = 'get'
         path = f'stations/{self.organization_uuid}/virtual'
         return self._call_api(
-            method, path, paginated_endpoint=paginate, params=params
+            method, path, headers=headers, paginated_endpoint=paginate, params=params
         )
     
     def _call_get_data_values_for_site(
@@ -196,6 +295,53 @@ class IEasyHydroHFSDKEndpointsBase(IEasyHydroHFSDKBase):
             params=params,
         )
     
+    def _iter_data_values_pages(self, filters, max_in_flight=None):
+        """Yield the `results` of every page of the sdk-data-values endpoint in order.
+
+        The total is learned from the first response, after which up to `max_in_flight`
+        upcoming pages are requested concurrently.
+
+        Args:
+            filters: Already mapped API filters, `page` sets the first page to fetch
+            max_in_flight: Maximum number of concurrently requested pages, defaults to `max_workers`
+        """
+        filters = dict(filters)
+        max_in_flight = max_in_flight or self.max_workers
+
+        def _fetch(page):
+            page_filters = dict(filters, page=page) if page else filters
+            response = self._call_get_data_values_for_site(filters=page_filters)
+            if response.status_code != 200:
+                raise ValueError(
+                    f"Could not retrieve data values page {page or 1}, got status code {response.status_code}"
+                )
+            return self._response_json(response)
+
+        first_page = filters.get('page') or 1
+        response_json = _fetch(filters.get('page'))
+        results = response_json['results']
+        yield results
+
+        if not response_json.get('next') or not results:
+            if self.instrumentation is not None:
+                self.instrumentation.pages(f'sdk-data-values/{self.organization_uuid}', 1)
+            return
+
+        # a full first page tells the effective page size, even if the server capped page_size
+        last_page = math.ceil(response_json['count'] / len(results))
+        pages = iter(range(first_page + 1, last_page + 1))
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            in_flight = deque(executor.submit(_fetch, page) for page in islice(pages, max_in_flight))
+            while in_flight:
+                page_json = in_flight.popleft().result()
+                next_page = next(pages, None)
+                if next_page is not None:
+                    in_flight.append(executor.submit(_fetch, next_page))
+                yield page_json['results']
+
+        if self.instrumentation is not None:
+            self.instrumentation.pages(f'sdk-data-values/{self.organization_uuid}', last_page - first_page + 1)
+
     def _ensure_norm_data_has_correct_length(self, norm_data, norm_period):
         period_lengths = {
             'd': 36,  # Daily - 36 values (3 per month)
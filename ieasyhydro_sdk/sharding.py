@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone
+
+from ieasyhydro_sdk.cache import to_timestamp
+
+
+SHARD_UNITS = ('year', 'month')
+
+# (lower bound filters, upper bound filters) of the time columns a window can be sharded on
+_WINDOW_FILTERS = (
+    (('utc_date_time__gte', 'utc_date_time__gt'), ('utc_date_time__lt', 'utc_date_time__lte')),
+    (('local_date_time__gte', 'local_date_time__gt'), ('local_date_time__lt', 'local_date_time__lte')),
+)
+
+
+def _next_boundary(moment, shard):
+    if shard == 'year':
+        return moment.replace(year=moment.year + 1, month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    if shard == 'month':
+        year, month = divmod(moment.month, 12)
+        return moment.replace(
+            year=moment.year + year, month=month + 1, day=1, hour=0, minute=0, second=0, microsecond=0
+        )
+    return moment + shard
+
+
+def split_time_window(start, end, shard):
+    """Split the window [start, end) into consecutive sub-windows.
+
+    Args:
+        start: Start of the window (epoch, datetime or ISO string)
+        end: End of the window (epoch, datetime or ISO string)
+        shard: 'year' or 'month' to split at calendar boundaries, or a `timedelta`
+
+    Returns:
+        List of (start, end) pairs of timezone aware UTC datetimes
+    """
+    if shard not in SHARD_UNITS and not isinstance(shard, timedelta):
+        raise ValueError(f"Invalid shard '{shard}'. Must be a timedelta or one of: {', '.join(SHARD_UNITS)}")
+    if isinstance(shard, timedelta) and shard <= timedelta(0):
+        raise ValueError("Shard length must be positive")
+
+    start = datetime.fromtimestamp(to_timestamp(start), timezone.utc)
+    end = datetime.fromtimestamp(to_timestamp(end), timezone.utc)
+    windows = []
+    while start < end:
+        boundary = min(_next_boundary(start, shard), end)
+        windows.append((start, boundary))
+        start = boundary
+    return windows
+
+
+def shard_filters(filters, shard):
+    """Split data value filters with a bounded time window into one filter set per shard.
+
+    The window is taken from the UTC time filters, or from the local time filters if no UTC
+    bounds are set. Inner shard bounds use `__gte`/`__lt`, so consecutive shards do not
+    overlap; the outer bounds keep the requested operators. Filters without both a lower and an
+    upper bound are returned unsharded.
+
+    Args:
+        filters: Data value filters (SDK names, e.g. `utc_date_time__gte`)
+        shard: 'year', 'month' or a `timedelta`
+    """
+    for lower_names, upper_names in _WINDOW_FILTERS:
+        lower_name = next((name for name in lower_names if filters.get(name) is not None), None)
+        upper_name = next((name for name in upper_names if filters.get(name) is not None), None)
+        if lower_name and upper_name:
+            break
+    else:
+        return [filters]
+
+    windows = split_time_window(filters[lower_name], filters[upper_name], shard)
+    if len(windows) <= 1:
+        return [filters]
+
+    gte_name, lt_name = lower_names[0], upper_names[0]
+    sharded = []
+    for index, (start, end) in enumerate(windows):
+        shard_filters_ = {
+            name: value for name, value in filters.items() if name not in lower_names + upper_names
+        }
+        if index == 0:
+            shard_filters_[lower_name] = filters[lower_name]
+        else:
+            shard_filters_[gte_name] = start.isoformat()
+        if index == len(windows) - 1:
+            shard_filters_[upper_name] = filters[upper_name]
+        else:
+            shard_filters_[lt_name] = end.isoformat()
+        sharded.append(shard_filters_)
+    return sharded
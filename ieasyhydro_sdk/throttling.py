@@ -0,0 +1,163 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+
+# responses telling the client to slow down
+THROTTLE_STATUS_CODES = frozenset([429, 503])
+# responses worth retrying for idempotent requests
+RETRY_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+
+def parse_retry_after(value):
+    """Return the seconds to wait for a Retry-After header value (seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    from email.utils import parsedate_to_datetime
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0):
+    """Exponential backoff with full jitter for the given (zero based) retry attempt."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class AdaptiveRateLimiter:
+    """Client-wide token bucket combined with an adaptive concurrency limit.
+
+    The concurrency limit grows by one request per "round" of successful responses and is
+    halved when the server throttles (429/503, Retry-After) or the latency spikes well above
+    its moving average; the request rate is halved together with it and recovers gradually.
+    A Retry-After pauses all requests until it has passed.
+
+    Args:
+        rate: Maximum requests per second, None for no rate limit
+        burst: Bucket size, how many requests may be sent at once after an idle period
+        max_concurrency: Upper bound of concurrent requests
+        min_concurrency: Lower bound the concurrency limit shrinks to
+        latency_spike_factor: A response slower than this multiple of the moving average
+            latency counts as a slow down signal
+    """
+
+    def __init__(
+            self,
+            rate=None,
+            burst=None,
+            max_concurrency=10,
+            min_concurrency=1,
+            latency_spike_factor=4.0,
+    ):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst or max(1, int(rate or 1))
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency_limit = float(max_concurrency)
+        self.latency_spike_factor = latency_spike_factor
+        self.average_latency = None
+        self._latency_samples = 0
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    def _refill(self, now):
+        if self.rate is None:
+            return
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self._in_flight >= int(self.concurrency_limit):
+                    # woken up by release
+                    wait = None
+                elif self.rate is not None and self._tokens < 1:
+                    wait = (1 - self._tokens) / self.rate
+                else:
+                    break
+                self._condition.wait(wait)
+
+            if self.rate is not None:
+                self._tokens -= 1
+            self._in_flight += 1
+
+    def release(self, status_code=None, latency=None, retry_after=None):
+        """Report the outcome of a request sent after `acquire`.
+
+        Args:
+            status_code: HTTP status code, None if the request failed without a response
+            latency: Seconds the request took
+            retry_after: Seconds the server asked to wait before the next request
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+            if status_code in THROTTLE_STATUS_CODES or retry_after or self._is_latency_spike(latency):
+                self._slow_down()
+            elif status_code is not None and status_code < 500:
+                self._recover()
+
+            if latency is not None:
+                self._record_latency(latency)
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """Context manager around `acquire`/`release`, the yielded dict collects the outcome
+        (`status_code`, `retry_after`) while the latency is measured."""
+        self.acquire()
+        outcome = {'status_code': None, 'retry_after': None}
+        started_at = time.monotonic()
+        try:
+            yield outcome
+        finally:
+            self.release(outcome['status_code'], time.monotonic() - started_at, outcome['retry_after'])
+
+    def _is_latency_spike(self, latency):
+        return (
+            latency is not None
+            and self._latency_samples >= 10
+            and latency > self.average_latency * self.latency_spike_factor
+        )
+
+    def _record_latency(self, latency):
+        self._latency_samples += 1
+        if self.average_latency is None:
+            self.average_latency = latency
+        else:
+            self.average_latency += 0.1 * (latency - self.average_latency)
+
+    def _slow_down(self):
+        self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit / 2)
+        if self.rate is not None:
+            self.rate = max(self.max_rate / 16, self.rate / 2)
+
+    def _recover(self):
+        self.concurrency_limit = min(self.max_concurrency, self.concurrency_limit + 1 / self.concurrency_limit)
+        if self.rate is not None:
+            self.rate = min(self.max_rate, self.rate * 1.05)
@@ -0,0 +1,421 @@
+import json
+import math
+import threading
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qsl, urlsplit
+
+from ieasyhydro_sdk.cache import to_timestamp
+
+
+DEFAULT_TRANSPORT_POOL_SIZE = 10
+# exceptions of failed requests worth retrying, for transports without `connection_errors`
+CONNECTION_ERRORS = (ConnectionError, TimeoutError)
+
+
+class TransportHeaders(dict):
+    """Response headers with case-insensitive lookups."""
+
+    def __init__(self, headers=None):
+        super().__init__((key.lower(), value) for key, value in (headers or {}).items())
+
+    def __getitem__(self, key):
+        return super().__getitem__(key.lower())
+
+    def __contains__(self, key):
+        return super().__contains__(key.lower())
+
+    def get(self, key, default=None):
+        return super().get(key.lower(), default)
+
+
+class TransportResponse:
+    """Response returned by the offline transports, offers the parts of `requests.Response`
+    used by the SDK."""
+
+    def __init__(self, status_code, content=b'', headers=None, url=''):
+        self.status_code = status_code
+        self.content = content.encode('utf-8') if isinstance(content, str) else content
+        self.headers = TransportHeaders(headers)
+        self.url = url
+
+    def __bool__(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def json_response(status_code, data, url='', headers=None):
+    return TransportResponse(
+        status_code, json.dumps(data), {'Content-Type': 'application/json', **(headers or {})}, url
+    )
+
+
+def _request_key(method, url, params):
+    # the host is left out so cassettes can be replayed against any configured host
+    query = parse_qsl(urlsplit(url).query)
+    for name, value in (params or {}).items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        query += [(name, str(item)) for item in values if item is not None]
+    return method.upper(), urlsplit(url).path, tuple(sorted(query))
+
+
+class SessionTransport:
+    """Sends requests over HTTP with a pooled keep-alive `requests.Session`, the default transport.
+
+    `requests` is imported and the session created when the first request is sent, so creating a
+    client stays cheap for short-lived processes.
+
+    Args:
+        pool_size: Number of connections kept open per host
+    """
+
+    def __init__(self, pool_size=DEFAULT_TRANSPORT_POOL_SIZE):
+        self.pool_size = pool_size
+        self._session = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # a copy sent to another process opens its own session
+        return {'pool_size': self.pool_size}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    # retries are handled by the SDK so they go through its rate limiter
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_size,
+                        pool_maxsize=self.pool_size,
+                        max_retries=0,
+                    )
+                    session = requests.Session()
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    @property
+    def connection_errors(self):
+        """Exceptions of failed requests worth retrying."""
+        import requests
+
+        return requests.ConnectionError, requests.Timeout
+
+    def request(self, method, url, headers=None, json=None, params=None, timeout=None):
+        return self.session.request(
+            method=method, url=url, headers=headers, json=json, params=params, timeout=timeout,
+        )
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+
+class RecordingTransport:
+    """Sends requests with another transport and records them to a cassette file.
+
+    The cassette is written when the SDK is closed (or `save` is called) and can be replayed
+    with `ReplayTransport`. Request bodies and headers are not recorded, response bodies are,
+    so cassettes of login requests contain access tokens.
+
+    Args:
+        path: Path of the cassette (JSON) file
+        transport: Transport used to send the requests, a `SessionTransport` by default
+    """
+
+    def __init__(self, path, transport=None):
+        self.path = str(path)
+        self.transport = transport or SessionTransport()
+        self.interactions = []
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {key: value for key, value in self.__dict__.items() if key != '_lock'}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def connection_errors(self):
+        return getattr(self.transport, 'connection_errors', CONNECTION_ERRORS)
+
+    def request(self, method, url, headers=None, json=None, params=None, timeout=None):
+        response = self.transport.request(method, url, headers=headers, json=json, params=params, timeout=timeout)
+        method_, path, query = _request_key(method, url, params)
+        with self._lock:
+            self.interactions.append({
+                'method': method_,
+                'path': path,
+                'query': [list(item) for item in query],
+                'status_code': response.status_code,
+                'headers': dict(response.headers),
+                'body': response.content.decode('utf-8'),
+            })
+        return response
+
+    def save(self):
+        with self._lock:
+            with open(self.path, 'w', encoding='utf-8') as cassette_file:
+                json.dump({'interactions': self.interactions}, cassette_file, indent=1)
+
+    def close(self):
+        self.save()
+        self.transport.close()
+
+
+class ReplayTransport:
+    """Answers requests with the responses recorded by `RecordingTransport`, without network access.
+
+    Requests are matched by method, path and query parameters. Responses recorded several
+    times for the same request are replayed in the recorded order, the last one is repeated
+    once all are used.
+
+    Args:
+        cassette: Path of a cassette file, or the cassette dict
+    """
+
+    def __init__(self, cassette):
+        if not isinstance(cassette, dict):
+            with open(cassette, encoding='utf-8') as cassette_file:
+                cassette = json.load(cassette_file)
+
+        self._responses = {}
+        for interaction in cassette['interactions']:
+            key = (interaction['method'], interaction['path'], tuple(tuple(item) for item in interaction['query']))
+            self._responses.setdefault(key, []).append(interaction)
+        self._replayed = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {key: value for key, value in self.__dict__.items() if key != '_lock'}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def request(self, method, url, headers=None, json=None, params=None, timeout=None):
+        key = _request_key(method, url, params)
+        with self._lock:
+            interactions = self._responses.get(key)
+            if not interactions:
+                raise ValueError(f"No recorded response for {key[0]} {key[1]} with parameters {list(key[2])}")
+            position = self._replayed.get(key, 0)
+            self._replayed[key] = position + 1
+        interaction = interactions[min(position, len(interactions) - 1)]
+        return TransportResponse(interaction['status_code'], interaction['body'], interaction['headers'], url)
+
+    def close(self):
+        pass
+
+
+class SyntheticHFTransport:
+    """Serves a generated iEasyHydroHF organization, for benchmarks and tests at any scale.
+
+    Answers the login, station listing, norm and data value endpoints used by
+    `IEasyHydroHFSDK`. Values are deterministic, so repeated runs return the same data.
+
+    Args:
+        station_count: Number of hydrological (manual) and of meteo stations
+        virtual_station_count: Number of virtual stations
+        variables: Variable names served for every station
+        start: First timestamp of every series
+        end: Timestamp every series ends before
+        step: Interval between values
+        page_size: Stations per data value page when the request does not set one
+    """
+
+    organization_uuid = '00000000-0000-0000-0000-000000000001'
+
+    def __init__(
+            self,
+            station_count=10,
+            virtual_station_count=0,
+            variables=('WDD', 'WLD'),
+            start='2020-01-01T00:00:00Z',
+            end='2021-01-01T00:00:00Z',
+            step=timedelta(days=1),
+            page_size=10,
+    ):
+        self.variables = tuple(variables)
+        self.start = to_timestamp(start)
+        self.end = to_timestamp(end)
+        self.step = step.total_seconds()
+        self.page_size = page_size
+        self.stations = {
+            'hydrological': [self._station(index, 'M') for index in range(station_count)],
+            'meteo': [self._station(station_count + index, None) for index in range(station_count)],
+            'virtual': [
+                self._station(2 * station_count + index, 'V') for index in range(virtual_station_count)
+            ],
+        }
+        self._stations_by_code = {
+            station['station_code']: station for stations in self.stations.values() for station in stations
+        }
+        self._stations_by_uuid = {
+            station['uuid']: station for stations in self.stations.values() for station in stations
+        }
+
+    @staticmethod
+    def _station(index, station_type):
+        station = {
+            'id': index + 1,
+            'uuid': f'00000000-0000-0000-0001-{index:012d}',
+            'station_code': str(10000 + index),
+            'name': f'Station {index}',
+            'secondary_name': f'Station {index}',
+            'country': 'Kyrgyzstan',
+            'latitude': 40.0 + index % 100 / 100,
+            'longitude': 72.0 + index % 100 / 100,
+            'elevation': 1000.0 + index,
+            'basin': {'name': f'Basin {index % 5}', 'secondary_name': f'Basin {index % 5}'},
+            'region': {'name': f'Region {index % 7}', 'secondary_name': f'Region {index % 7}'},
+            'bulletin_order': index,
+        }
+        if station_type is not None:
+            station.update({
+                'station_type': station_type,
+                'discharge_level_alarm': 100.0,
+                'historical_discharge_minimum': 1.0,
+                'historical_discharge_maximum': 500.0,
+                'daily_forecast': False,
+                'pentad_forecast': True,
+                'decadal_forecast': True,
+                'monthly_forecast': False,
+                'seasonal_forecast': False,
+            })
+        if station_type == 'V':
+            station['associations'] = []
+        return station
+
+    @staticmethod
+    def _value(station_id, variable, timestamp):
+        day_of_year = datetime.fromtimestamp(timestamp, timezone.utc).timetuple().tm_yday
+        seasonal = math.sin(2 * math.pi * (day_of_year - 80) / 365)
+        return round(50 + 10 * (station_id % 10) + 40 * seasonal + len(variable), 2)
+
+    def request(self, method, url, headers=None, json=None, params=None, timeout=None):
+        path = urlsplit(url).path.rstrip('/')
+        params = dict(params or {})
+        parts = path.split('/')
+
+        if path.endswith('auth/token-obtain') or path.endswith('auth/token-refresh'):
+            return json_response(200, {
+                'access': 'synthetic-access-token',
+                'refresh': 'synthetic-refresh-token',
+                'user': {'organization': {'uuid': self.organization_uuid}},
+            }, url)
+        if 'stations' in parts:
+            return self._stations_response(parts[-1], params, url)
+        if 'hydrological-norms' in parts or 'meteorological-norms' in parts:
+            return self._norm_response(parts[-1], params, url)
+        if 'sdk-data-values' in parts:
+            return self._data_values_response(params, url)
+        return json_response(404, {'detail': 'Not found.'}, url)
+
+    def _stations_response(self, kind, params, url):
+        stations = self.stations.get(kind)
+        if stations is None:
+            return json_response(404, {'detail': 'Not found.'}, url)
+        if params.get('station_code'):
+            stations = [station for station in stations if station['station_code'] == params['station_code']]
+        if params.get('station_type'):
+            stations = [station for station in stations if station.get('station_type') == params['station_type']]
+        return json_response(200, stations, url)
+
+    def _norm_response(self, station_uuid, params, url):
+        station = self._stations_by_uuid.get(station_uuid)
+        if station is None:
+            return json_response(404, {'detail': 'Not found.'}, url)
+        length = {'d': 36, 'p': 72, 'm': 12}.get(params.get('norm_type'), 36)
+        return json_response(200, [
+            {'value': round(50 + 10 * (station['id'] % 10) + 40 * math.sin(2 * math.pi * (slot / length - 0.22)), 2)}
+            for slot in range(length)
+        ], url)
+
+    def _bounds(self, params):
+        start, end = self.start, self.end - self.step / 2
+        for name, value in params.items():
+            if value is None or not name.startswith('timestamp'):
+                continue
+            # local time is served as UTC + 6 hours
+            timestamp = to_timestamp(value) - (6 * 3600 if name.startswith('timestamp_local') else 0)
+            operator = name.rsplit('__', 1)[-1]
+            if operator == 'gte':
+                start = max(start, timestamp)
+            elif operator == 'gt':
+                start = max(start, timestamp + 1)
+            elif operator == 'lt':
+                end = min(end, timestamp - 1)
+            elif operator == 'lte':
+                end = min(end, timestamp)
+        first = max(0, math.ceil((start - self.start) / self.step))
+        last = math.floor((end - self.start) / self.step)
+        return first, last
+
+    def _data_values_response(self, params, url):
+        station_codes = params.get('station__station_code__in') or list(self._stations_by_code)
+        if isinstance(station_codes, str):
+            station_codes = station_codes.split(',')
+        variables = params.get('metric_name__in') or list(self.variables)
+        if isinstance(variables, str):
+            variables = variables.split(',')
+        stations = [self._stations_by_code[code] for code in station_codes if code in self._stations_by_code]
+
+        page = int(params.get('page') or 1)
+        page_size = int(params.get('page_size') or self.page_size)
+        page_stations = stations[(page - 1) * page_size:page * page_size]
+        first, last = self._bounds(params)
+
+        results = []
+        for station in page_stations:
+            data = []
+            for variable in variables:
+                if variable not in self.variables:
+                    continue
+                values = []
+                for position in range(first, last + 1):
+                    timestamp = self.start + position * self.step
+                    values.append({
+                        'value': self._value(station['id'], variable, timestamp),
+                        'value_type': 'M',
+                        'timestamp_local': datetime.fromtimestamp(
+                            timestamp + 6 * 3600, timezone.utc
+                        ).replace(tzinfo=None).isoformat(),
+                        'timestamp_utc': datetime.fromtimestamp(timestamp, timezone.utc).isoformat().replace(
+                            '+00:00', 'Z'
+                        ),
+                        'value_code': None,
+                    })
+                data.append({'variable_code': variable, 'unit': 'm3/s', 'values': values})
+            results.append({
+                'station_id': station['id'],
+                'station_uuid': station['uuid'],
+                'station_code': station['station_code'],
+                'station_name': station['name'],
+                'station_type': 'meteo' if station.get('station_type') is None else 'hydro',
+                'data': data,
+            })
+
+        has_next = page * page_size < len(stations)
+        return json_response(200, {
+            'count': len(stations),
+            'next': f'{url}?page={page + 1}' if has_next else None,
+            'previous': f'{url}?page={page - 1}' if page > 1 else None,
+            'results': results,
+        }, url)
+
+    def close(self):
+        pass
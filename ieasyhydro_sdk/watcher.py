@@ -0,0 +1,178 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timezone
+
+from ieasyhydro_sdk.cache import to_timestamp
+from ieasyhydro_sdk.catalog import _atomic_write_json
+from ieasyhydro_sdk.instrumentation import logger
+
+
+DEFAULT_POLL_INTERVAL = 300
+DEFAULT_WATCH_BATCH_SIZE = 50
+
+
+class DataValuesWatcher:
+    """Polls the iEasyHydroHF SDK for data values newer than the last ones seen.
+
+    A high-water mark (the latest `timestamp_utc`) is kept per station and variable. Every poll
+    requests the stations in batches with an `utc_date_time__gt` filter, starting at the oldest
+    mark of the batch, and only values newer than the mark of their own series are delivered.
+    Marks are only advanced after the new values were handed over (the callback returned, or the
+    async iterator was resumed) and are stored in the checkpoint file, so a restarted watcher
+    continues where it stopped without fetching the history again.
+
+    Args:
+        sdk: `IEasyHydroHFSDK` instance
+        site_codes: Codes of the watched stations
+        variable_names: Watched variable names
+        checkpoint: Optional path of a JSON file the high-water marks are stored in
+        since: Start of series without a mark (epoch, datetime or ISO string), defaults to now
+        interval: Seconds between the start of two polls
+        batch_size: Number of stations requested together
+    """
+
+    def __init__(
+            self,
+            sdk,
+            site_codes,
+            variable_names,
+            checkpoint=None,
+            since=None,
+            interval=DEFAULT_POLL_INTERVAL,
+            batch_size=DEFAULT_WATCH_BATCH_SIZE,
+    ):
+        if not site_codes or not variable_names:
+            raise ValueError("You must specify at least one site code and one variable name")
+
+        self.sdk = sdk
+        self.site_codes = list(site_codes)
+        self.variable_names = list(variable_names)
+        self.checkpoint = str(checkpoint) if checkpoint else None
+        self.since = to_timestamp(since) if since is not None else time.time()
+        self.interval = interval
+        self.batch_size = batch_size
+        self.high_water_marks = self._load_checkpoint()
+        self._stopped = threading.Event()
+
+    @staticmethod
+    def _series_key(site_code, variable_name):
+        return f'{site_code}|{variable_name}'
+
+    def _load_checkpoint(self):
+        if not self.checkpoint:
+            return {}
+        try:
+            with open(self.checkpoint, encoding='utf-8') as checkpoint_file:
+                return json.load(checkpoint_file)
+        except FileNotFoundError:
+            return {}
+
+    def _save_checkpoint(self):
+        if not self.checkpoint:
+            return
+        _atomic_write_json(self.checkpoint, self.high_water_marks)
+
+    def _high_water_mark(self, site_code, variable_name):
+        return self.high_water_marks.get(self._series_key(site_code, variable_name), self.since)
+
+    def _poll(self):
+        """Fetch the new values of all stations, returns the rows and the advanced marks."""
+        rows = []
+        marks = {}
+        for start in range(0, len(self.site_codes), self.batch_size):
+            batch = self.site_codes[start:start + self.batch_size]
+            oldest_mark = min(
+                self._high_water_mark(site_code, variable_name)
+                for site_code in batch
+                for variable_name in self.variable_names
+            )
+            filters = {
+                'site_codes': batch,
+                'variable_names': self.variable_names,
+                'utc_date_time__gt': datetime.fromtimestamp(oldest_mark, timezone.utc).isoformat(),
+            }
+            for station in self.sdk.iter_data_values_for_site(filters=filters):
+                site_code = station.get('station_code')
+                for variable_data in station.get('data', []):
+                    variable_name = variable_data.get('variable_code')
+                    key = self._series_key(site_code, variable_name)
+                    mark = self._high_water_mark(site_code, variable_name)
+                    for value in variable_data.get('values', []):
+                        timestamp = to_timestamp(value['timestamp_utc'])
+                        if timestamp <= mark:
+                            continue
+                        rows.append({
+                            'site_code': site_code,
+                            'variable_code': variable_name,
+                            'unit': variable_data.get('unit'),
+                            **value,
+                        })
+                        marks[key] = max(marks.get(key, mark), timestamp)
+        return rows, marks
+
+    def _advance(self, marks):
+        if not marks:
+            return
+        self.high_water_marks.update(marks)
+        self._save_checkpoint()
+
+    def poll_once(self):
+        """Poll all stations once, advance the marks and return the new rows."""
+        rows, marks = self._poll()
+        self._advance(marks)
+        return rows
+
+    def stop(self):
+        """Stop `watch` or the async iteration after the current poll."""
+        self._stopped.set()
+
+    def _wait(self, started_at):
+        return max(0.0, self.interval - (time.monotonic() - started_at))
+
+    def watch(self, callback, max_polls=None):
+        """Poll every `interval` seconds and call `callback(rows)` with the new rows of every poll.
+
+        Args:
+            callback: Called with a non-empty list of new rows, marks only advance once it returns
+            max_polls: Stop after this many polls, poll until `stop` is called if None
+        """
+        self._stopped.clear()
+        polls = 0
+        while not self._stopped.is_set():
+            started_at = time.monotonic()
+            try:
+                rows, marks = self._poll()
+            except Exception as exc:
+                # the next poll starts from the same marks
+                logger.warning('data value poll failed: %s', exc)
+            else:
+                if rows:
+                    callback(rows)
+                self._advance(marks)
+
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                break
+            self._stopped.wait(self._wait(started_at))
+
+    async def __aiter__(self):
+        """Yield the non-empty lists of new rows of polls every `interval` seconds.
+
+        Polls run in a worker thread, marks advance when the iteration is resumed.
+        """
+        self._stopped.clear()
+        while not self._stopped.is_set():
+            started_at = time.monotonic()
+            try:
+                rows, marks = await asyncio.to_thread(self._poll)
+            except Exception as exc:
+                logger.warning('data value poll failed: %s', exc)
+            else:
+                if rows:
+                    yield rows
+                self._advance(marks)
+
+            if not self._stopped.is_set():
+                await asyncio.sleep(self._wait(started_at))
@@ -3,7 +3,7 @@ from setuptools import setup, find_packages
 setup(
     name="ieasyhydro_sdk",
     version="0.3.2",
-    packages=find_packages(),
+    packages=find_packages(exclude=("benchmarks", "benchmarks.*", "tests", "tests.*")),
     author="Domagoj Levanić",
     author_email="domagoj.levanic@encode.hr",
     description="Python SDK for iEasyHydro Rest API",
@@ -14,4 +14,17 @@ setup(
     install_requires=[
         'requests>=2.31.0',
     ],
+    extras_require={
+        'async': ['httpx>=0.24.0'],
+        'columnar': ['numpy>=1.22'],
+        'pandas': ['numpy>=1.22', 'pandas>=1.4'],
+        'orjson': ['orjson>=3.9'],
+        'parquet': ['pyarrow>=12'],
+        'prometheus': ['prometheus_client'],
+    },
+    entry_points={
+        'console_scripts': [
+            'ieasyhydro-export = ieasyhydro_sdk.export:main',
+        ],
+    },
 )
@@ -0,0 +1,19 @@
+import pytest
+
+from ieasyhydro_sdk.sdk import IEasyHydroHFSDK
+from ieasyhydro_sdk.transport import SyntheticHFTransport
+
+
+HOST = 'http://hf.test/api/v1/'
+
+
+@pytest.fixture
+def make_sdk():
+    """Factory of `IEasyHydroHFSDK` clients answered by the given transport, a
+    `SyntheticHFTransport` by default."""
+    def _make_sdk(transport=None, **kwargs):
+        return IEasyHydroHFSDK(
+            host=HOST, username='user', password='secret', transport=transport or SyntheticHFTransport(), **kwargs
+        )
+
+    return _make_sdk
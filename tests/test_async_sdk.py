@@ -0,0 +1,182 @@
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip('httpx')
+
+from ieasyhydro_sdk.async_sdk import AsyncIEasyHydroHFSDK
+from ieasyhydro_sdk.sdk import IEasyHydroHFSDK
+from ieasyhydro_sdk.transport import SyntheticHFTransport
+
+
+class SyntheticServer:
+    """`httpx.MockTransport` handler answering from a `SyntheticHFTransport`.
+
+    Records the path and query of every request and how many requests were in flight at most.
+    Responses of paths in `overrides` are replaced by the given (status code, JSON body).
+    """
+
+    def __init__(self, delay=0.0, overrides=None):
+        self.synthetic = SyntheticHFTransport(station_count=3)
+        self.delay = delay
+        self.overrides = overrides or {}
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request):
+        self.requests.append((request.method, request.url.path, request.url.params))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+
+        for path, (status_code, body) in self.overrides.items():
+            if request.url.path.endswith(path):
+                return httpx.Response(status_code, json=body)
+
+        params = {
+            name: values if len(values) > 1 else values[0]
+            for name, values in ((name, request.url.params.get_list(name)) for name in request.url.params.keys())
+        }
+        response = self.synthetic.request(request.method, str(request.url.copy_with(query=None)), params=params)
+        return httpx.Response(response.status_code, content=response.content, headers=dict(response.headers))
+
+    def paths(self, part):
+        return [path for _, path, _ in self.requests if part in path]
+
+
+def make_sdk(server, **kwargs):
+    return AsyncIEasyHydroHFSDK(
+        host='http://hf.test/api/v1/', username='user', password='secret',
+        transport=httpx.MockTransport(server), **kwargs
+    )
+
+
+def run(coroutine_function):
+    return asyncio.run(coroutine_function())
+
+
+def test_concurrent_first_calls_share_one_login():
+    server = SyntheticServer(delay=0.01)
+
+    async def main():
+        async with make_sdk(server) as sdk:
+            return await asyncio.gather(*(sdk.get_discharge_sites() for _ in range(10)))
+
+    results = run(main)
+
+    assert len(server.paths('auth/token-obtain')) == 1
+    assert len(server.paths('stations/')) == 10
+    assert all(len(sites) == 3 for sites in results)
+
+
+def test_requests_in_flight_are_limited():
+    server = SyntheticServer(delay=0.01)
+
+    async def main():
+        async with make_sdk(server, max_concurrency=3) as sdk:
+            await sdk.get_meteo_sites()
+            server.max_in_flight = 0
+            await asyncio.gather(*(sdk.get_meteo_sites() for _ in range(12)))
+
+    run(main)
+
+    assert server.max_in_flight == 3
+
+
+def test_sites_match_the_sync_sdk():
+    server = SyntheticServer()
+
+    async def main():
+        async with make_sdk(server) as sdk:
+            return await sdk.get_discharge_sites()
+
+    sync_sdk = IEasyHydroHFSDK(
+        host='http://hf.test/api/v1/', username='user', password='secret', transport=server.synthetic
+    )
+    assert run(main) == sync_sdk.get_discharge_sites()
+
+
+def test_filters_are_mapped_like_the_sync_sdk():
+    server = SyntheticServer()
+    filters = {
+        'site_codes': ['10000', '10001'],
+        'variable_names': ['WDD'],
+        'local_date_time__gte': '2020-01-01T00:00:00',
+        'utc_date_time__lt': '2020-01-10T00:00:00Z',
+    }
+
+    async def main():
+        async with make_sdk(server) as sdk:
+            return sdk._map_filters(filters), await sdk.get_data_values_for_site(filters)
+
+    mapped, response = run(main)
+
+    sync_sdk = IEasyHydroHFSDK(
+        host='http://hf.test/api/v1/', username='user', password='secret', transport=server.synthetic
+    )
+    assert mapped == sync_sdk._map_filters(filters)
+
+    _, _, params = server.requests[-1]
+    assert params.get_list('station__station_code__in') == ['10000', '10001']
+    assert params['timestamp_local__gte'] == '2020-01-01T00:00:00'
+    assert params['timestamp__lt'] == '2020-01-10T00:00:00Z'
+    assert params['view_type'] == 'measurements'
+    assert [station['station_code'] for station in response['results']] == ['10000', '10001']
+
+
+@pytest.mark.parametrize('norm_period, served, expected_length', [('d', 30, 36), ('p', 80, 72), ('m', 12, 12)])
+def test_norms_are_normalized_to_the_period_length(norm_period, served, expected_length):
+    server = SyntheticServer(overrides={
+        '00000000-0000-0000-0001-000000000000': (200, [{'value': str(index)} for index in range(served)]),
+    })
+
+    async def main():
+        async with make_sdk(server) as sdk:
+            return await sdk.get_norm_for_site('10000', 'discharge', norm_period=norm_period)
+
+    norm = run(main)
+
+    assert len(norm) == expected_length
+    assert norm[:min(served, expected_length)] == [float(index) for index in range(min(served, expected_length))]
+    assert all(value is None for value in norm[served:])
+
+
+def test_failed_norm_request_raises():
+    server = SyntheticServer(overrides={'00000000-0000-0000-0001-000000000000': (500, {})})
+
+    async def main():
+        async with make_sdk(server) as sdk:
+            return await sdk.get_norm_for_site('10000', 'water_level')
+
+    with pytest.raises(ValueError, match='status code 500'):
+        run(main)
+
+
+def test_station_type_fallback_logs_a_warning(caplog):
+    server = SyntheticServer(overrides={'/hydrological': (200, [{'uuid': 'automatic-uuid', 'station_type': 'A'}])})
+
+    async def main():
+        async with make_sdk(server) as sdk:
+            return await sdk._get_site_uuid_for_site_code('10000', 'hydro', station_type='M')
+
+    with caplog.at_level('WARNING', logger='ieasyhydro_sdk'):
+        assert run(main) == 'automatic-uuid'
+    assert 'No site found with station_type=M' in caplog.text
+
+
+def test_settings_are_read_from_the_sync_environment_variables(monkeypatch):
+    monkeypatch.setenv('IEASYHYDROHF_USERNAME', 'env-user')
+    monkeypatch.setenv('IEASYHYDROHF_PASSWORD', 'env-secret')
+    monkeypatch.delenv('IEASYHYDROHF_HOST', raising=False)
+
+    sdk = AsyncIEasyHydroHFSDK(transport=httpx.MockTransport(SyntheticServer()))
+
+    assert (sdk.host, sdk.username, sdk.password) == (IEasyHydroHFSDK.default_host, 'env-user', 'env-secret')
+
+    monkeypatch.delenv('IEASYHYDROHF_PASSWORD')
+    with pytest.raises(ValueError, match='IEASYHYDROHF_PASSWORD'):
+        AsyncIEasyHydroHFSDK(transport=httpx.MockTransport(SyntheticServer()))
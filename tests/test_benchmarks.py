@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from benchmarks.__main__ import main
+from benchmarks.harness import load_benchmarks, measure, regressions
+
+
+BENCHMARKS = load_benchmarks()
+
+
+@pytest.mark.parametrize('name', sorted(BENCHMARKS))
+def test_benchmark_runs(name):
+    result = measure(BENCHMARKS[name], scale=0.05, repeat=1)
+
+    assert result['items'] > 0
+    assert result['throughput'] > 0
+    assert result['peak_mib'] > 0
+
+
+def test_sharded_and_columnar_values_match_all_pages():
+    counts = {
+        name: BENCHMARKS[name].setup(0.05)()
+        for name in ('get_data_values_all_pages', 'get_data_values_sharded', 'get_data_values_columnar')
+    }
+    assert len(set(counts.values())) == 1
+
+
+def test_regressions_against_baseline():
+    name = 'get_discharge_sites'
+    baseline = {'name': name, 'scale': 0.5, 'unit': 'sites', 'throughput': 1000.0, 'peak_mib': 1.0}
+
+    assert regressions(dict(baseline, throughput=900.0, peak_mib=1.1), baseline) == []
+    assert len(regressions(dict(baseline, throughput=500.0, peak_mib=2.5), baseline)) == 2
+    # small absolute differences are not regressions
+    assert regressions(dict(baseline, peak_mib=1.9), baseline) == []
+    # results of other scales are not comparable
+    assert regressions(dict(baseline, scale=1, throughput=500.0), baseline) == []
+    assert regressions(dict(baseline, scale=1, peak_mib=BENCHMARKS[name].max_peak_mib + 1)) != []
+
+
+def test_runner_compares_with_saved_baseline(tmp_path, capsys):
+    baseline = tmp_path / 'baseline.json'
+    assert main(['get_norms_for_sites', '--scale', '0.05', '--repeat', '1', '--save', str(baseline)]) == 0
+
+    (result,) = json.loads(baseline.read_text())
+    baseline.write_text(json.dumps([dict(result, throughput=result['throughput'] * 100)]))
+    assert main(['get_norms_for_sites', '--scale', '0.05', '--repeat', '1', '--compare', str(baseline)]) == 1
+    assert 'REGRESSION' in capsys.readouterr().out
+
+
+def test_creating_clients_does_not_import_deferred_modules():
+    run = BENCHMARKS['import_and_create_clients'].setup(0.05)
+    # raises if requests, numpy or httpx were imported
+    assert run() == 1
@@ -0,0 +1,40 @@
+from ieasyhydro_sdk.transport import SyntheticHFTransport
+
+
+class OtherOrganizationTransport(SyntheticHFTransport):
+    """Synthetic organization with the same station codes but other values."""
+
+    organization_uuid = '00000000-0000-0000-0000-000000000002'
+
+    @staticmethod
+    def _value(station_id, variable, timestamp):
+        return -1.0
+
+
+FILTERS = {
+    'site_codes': ['10000'],
+    'variable_names': ['WDD'],
+    'utc_date_time__gte': '2020-01-01T00:00:00Z',
+    'utc_date_time__lt': '2020-01-11T00:00:00Z',
+}
+
+
+def values(response):
+    (station,) = response['results']
+    (variable,) = station['data']
+    return [value['value'] for value in variable['values']]
+
+
+def test_series_are_cached_per_organization(tmp_path, make_sdk):
+    cache = str(tmp_path / 'data_values.sqlite3')
+    first = make_sdk(SyntheticHFTransport(station_count=1), cache=cache)
+    second = make_sdk(OtherOrganizationTransport(station_count=1), cache=cache)
+
+    first_values = values(first.get_data_values_for_site(filters=FILTERS))
+    second_values = values(second.get_data_values_for_site(filters=FILTERS))
+
+    assert len(first_values) == len(second_values) == 10
+    assert -1.0 not in first_values
+    assert second_values == [-1.0] * 10
+    # both series are served from the shared cache afterwards
+    assert values(first.get_data_values_for_site(filters=FILTERS)) == first_values
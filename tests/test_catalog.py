@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+from ieasyhydro_sdk.catalog import _atomic_write_json
+
+
+def test_atomic_write_replaces_the_file(tmp_path):
+    path = tmp_path / 'manifest.json'
+    path.write_text('{"old": true}')
+
+    _atomic_write_json(str(path), {'new': True}, indent=2)
+
+    assert json.loads(path.read_text()) == {'new': True}
+    assert [entry.name for entry in tmp_path.iterdir()] == ['manifest.json']
+
+
+def test_failed_atomic_write_keeps_the_file_and_removes_the_temporary_file(tmp_path):
+    path = tmp_path / 'checkpoint.json'
+    path.write_text('{"old": true}')
+
+    with pytest.raises(TypeError):
+        _atomic_write_json(str(path), {'new': object()})
+
+    assert json.loads(path.read_text()) == {'old': True}
+    assert [entry.name for entry in tmp_path.iterdir()] == ['checkpoint.json']
+
+
+def test_listings_are_shared_through_the_directory(tmp_path, make_sdk):
+    first = make_sdk(site_catalog_dir=str(tmp_path))
+    sites = first.get_discharge_sites()
+
+    second = make_sdk(site_catalog_dir=str(tmp_path))
+    second.transport.request = None  # any request would fail
+
+    assert second.get_discharge_sites() == sites
+    assert not [entry for entry in tmp_path.iterdir() if entry.suffix == '.tmp']
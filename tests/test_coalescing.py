@@ -0,0 +1,159 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ieasyhydro_sdk import coalescing
+from ieasyhydro_sdk.coalescing import RequestCoalescer
+from ieasyhydro_sdk.instrumentation import Instrumentation
+from ieasyhydro_sdk.transport import json_response
+
+
+class CountingInstrumentation(Instrumentation):
+    """Counts the coalescer lookups that were shared and the ones that were sent."""
+
+    def __init__(self):
+        self.lookups = []
+
+    def cache(self, name, hit):
+        self.lookups.append(hit)
+
+
+class Upstream:
+    """`send` callable counting its calls, blocked until `release` is set."""
+
+    def __init__(self, status_code=200, error=None):
+        self.status_code = status_code
+        self.error = error
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self):
+        self.calls += 1
+        self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return json_response(self.status_code, {'call': self.calls})
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(coalescing.time, 'monotonic', lambda: now[0])
+    return now
+
+
+KEY = RequestCoalescer.key('get', 'stations/', {'organization': '1'}, {'page': 1})
+
+
+def run_concurrently(coalescer, upstream, callers):
+    """Call `coalescer.get` from several threads while the first call is held in flight."""
+    instrumentation = CountingInstrumentation()
+    coalescer.instrumentation = instrumentation
+    upstream.release.clear()
+
+    def _get():
+        try:
+            return coalescer.get(KEY, upstream)
+        except Exception as exc:
+            return exc
+
+    with ThreadPoolExecutor(max_workers=callers) as executor:
+        futures = [executor.submit(_get) for _ in range(callers)]
+        deadline = time.monotonic() + 5
+        while len(instrumentation.lookups) < callers and time.monotonic() < deadline:
+            time.sleep(0.001)
+        upstream.release.set()
+        return [future.result() for future in futures]
+
+
+def test_key_ignores_the_order_of_headers_and_parameters():
+    assert RequestCoalescer.key('get', 'p', {'a': '1', 'b': '2'}, {'x': [1, 2], 'y': None}) == \
+        RequestCoalescer.key('GET', 'p', {'b': '2', 'a': '1'}, {'x': ['1', '2']})
+
+
+def test_concurrent_identical_requests_share_one_upstream_call():
+    coalescer = RequestCoalescer()
+    upstream = Upstream()
+
+    responses = run_concurrently(coalescer, upstream, 8)
+
+    assert upstream.calls == 1
+    assert all(response is responses[0] for response in responses)
+    assert sorted(coalescer.instrumentation.lookups) == [False] + [True] * 7
+
+
+def test_followers_reraise_the_error_of_the_leader():
+    coalescer = RequestCoalescer(ttl=60)
+    upstream = Upstream(error=ConnectionError('connection reset'))
+
+    results = run_concurrently(coalescer, upstream, 4)
+
+    assert upstream.calls == 1
+    assert all(result is upstream.error for result in results)
+    # failures are neither memoized nor left in flight
+    assert coalescer.get(KEY, Upstream()).status_code == 200
+
+
+def test_without_ttl_finished_requests_are_sent_again():
+    coalescer = RequestCoalescer()
+    upstream = Upstream()
+
+    coalescer.get(KEY, upstream)
+    coalescer.get(KEY, upstream)
+
+    assert upstream.calls == 2
+
+
+def test_memoized_responses_expire_after_the_ttl(clock):
+    coalescer = RequestCoalescer(ttl=60)
+    upstream = Upstream()
+
+    first = coalescer.get(KEY, upstream)
+    clock[0] += 59
+    assert coalescer.get(KEY, upstream) is first
+
+    clock[0] += 1
+    assert coalescer.get(KEY, upstream) is not first
+    assert upstream.calls == 2
+
+
+def test_least_recently_used_responses_are_evicted(clock):
+    coalescer = RequestCoalescer(ttl=60, max_entries=2)
+    upstream = Upstream()
+
+    coalescer.get('a', upstream)
+    coalescer.get('b', upstream)
+    coalescer.get('a', upstream)
+    coalescer.get('c', upstream)
+    assert upstream.calls == 3
+
+    coalescer.get('a', upstream)
+    coalescer.get('c', upstream)
+    assert upstream.calls == 3
+    coalescer.get('b', upstream)
+    assert upstream.calls == 4
+
+
+@pytest.mark.parametrize('status_code', [201, 304, 404, 500])
+def test_only_successful_responses_are_memoized(status_code):
+    coalescer = RequestCoalescer(ttl=60)
+    upstream = Upstream(status_code=status_code)
+
+    coalescer.get(KEY, upstream)
+    coalescer.get(KEY, upstream)
+
+    assert upstream.calls == 2
+
+
+def test_invalidating_the_site_catalog_clears_the_memo(make_sdk):
+    sdk = make_sdk(coalesce=RequestCoalescer(ttl=60))
+    upstream = Upstream()
+    sdk.coalescer.get(KEY, upstream)
+
+    sdk.invalidate_site_catalog()
+    sdk.coalescer.get(KEY, upstream)
+
+    assert upstream.calls == 2
@@ -0,0 +1,81 @@
+import csv
+import json
+from urllib.parse import urlsplit
+
+from ieasyhydro_sdk.export import DataValuesExporter, export_data_values
+from ieasyhydro_sdk.transport import SyntheticHFTransport
+
+
+class DataValuesTransport(SyntheticHFTransport):
+    """Synthetic server recording the parameters of every data value request."""
+
+    def __init__(self, **kwargs):
+        super().__init__(start='2018-01-01T00:00:00Z', end='2021-01-01T00:00:00Z', **kwargs)
+        self.data_value_requests = []
+
+    def request(self, method, url, headers=None, json=None, params=None, timeout=None):
+        if 'sdk-data-values' in urlsplit(url).path:
+            self.data_value_requests.append(dict(params or {}))
+        return super().request(method, url, headers=headers, json=json, params=params, timeout=timeout)
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as csv_file:
+        return list(csv.DictReader(csv_file))
+
+
+def test_station_windows_are_exported_in_shards(tmp_path, make_sdk):
+    transport = DataValuesTransport(station_count=2)
+    stats = export_data_values(
+        make_sdk(transport), tmp_path, ['WDD'], site_codes=['10000', '10001'],
+        time_filters={'utc_date_time__gte': '2018-01-01T00:00:00Z', 'utc_date_time__lt': '2021-01-01T00:00:00Z'},
+    )
+
+    # one request per station and year
+    assert len(transport.data_value_requests) == 6
+    assert stats['stations'] == 2
+    assert stats['rows'] == 2 * (365 + 365 + 366)
+
+    rows = read_rows(tmp_path / 'site_code=10000' / 'WDD.csv')
+    timestamps = [row['timestamp_utc'] for row in rows]
+    assert len(timestamps) == len(set(timestamps)) == 365 + 365 + 366
+    assert timestamps == sorted(timestamps)
+
+
+def test_open_ended_window_is_sharded_until_now(tmp_path, make_sdk):
+    transport = DataValuesTransport(station_count=1)
+    stats = export_data_values(
+        make_sdk(transport), tmp_path, ['WDD'], site_codes=['10000'],
+        time_filters={'local_date_time__gte': '2020-01-01T00:00:00'}, shard='month',
+    )
+
+    assert stats['rows'] == 366
+    assert len(transport.data_value_requests) > 12
+    assert all('timestamp_local__lt' in params for params in transport.data_value_requests)
+
+
+def test_window_without_start_is_not_sharded(tmp_path, caplog, make_sdk):
+    transport = DataValuesTransport(station_count=1)
+    with caplog.at_level('WARNING', logger='ieasyhydro_sdk'):
+        stats = export_data_values(
+            make_sdk(transport), tmp_path, ['WDD'], site_codes=['10000'],
+            time_filters={'utc_date_time__lt': '2019-01-01T00:00:00Z'},
+        )
+
+    assert len(transport.data_value_requests) == 1
+    assert stats['rows'] == 365
+    assert 'not sharded' in caplog.text
+
+
+def test_interrupted_export_resumes(tmp_path, make_sdk):
+    transport = DataValuesTransport(station_count=2)
+    time_filters = {'utc_date_time__gte': '2020-01-01T00:00:00Z', 'utc_date_time__lt': '2021-01-01T00:00:00Z'}
+    export_data_values(make_sdk(transport), tmp_path, ['WDD'], site_codes=['10000'], time_filters=time_filters)
+
+    exporter = DataValuesExporter(make_sdk(transport), tmp_path)
+    stats = exporter.export(['WDD'], site_codes=['10000', '10001'], time_filters=time_filters)
+
+    assert stats['stations'] == 1
+    assert stats['skipped'] == 1
+    with open(exporter.manifest_path, encoding='utf-8') as manifest_file:
+        assert sorted(json.load(manifest_file)['completed']) == ['10000', '10001']
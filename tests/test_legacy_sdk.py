@@ -0,0 +1,155 @@
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+from ieasyhydro_sdk.instrumentation import Instrumentation
+from ieasyhydro_sdk.sdk import IEasyHydroSDK
+from ieasyhydro_sdk.transport import json_response
+
+
+class LegacyDataValuesTransport:
+    """Legacy API answering data value requests from one value per site and variable.
+
+    Site codes are sent back as integers, like the legacy API does, and the prepared
+    URL of every data values request is recorded.
+    """
+
+    def __init__(self, site_codes, variable_codes):
+        self.values = [
+            {
+                'dataValue': float(site_code),
+                'localDateTime': 1577858400,
+                'dateTimeUtc': 1577836800,
+                'site': {
+                    'siteCode': int(site_code), 'siteName': f'Site {site_code}', 'region': 'Chui',
+                    'basin': 'Chu', 'longitude': 74.5, 'latitude': 42.8,
+                },
+                'variable': {
+                    'variablecode': variable_code, 'variableName': {'term': variable_code},
+                    'variableUnit': {'unitAbbv': 'm3/s'},
+                },
+            }
+            for site_code in site_codes
+            for variable_code in variable_codes
+        ]
+        self.urls = []
+        # status codes answered to the first data values requests
+        self.faults = []
+
+    def request(self, method, url, headers=None, json=None, params=None, timeout=None):
+        if urlsplit(url).path.endswith('access_tokens'):
+            return json_response(201, {'resources': [{'tokenString': 'legacy-token'}]}, url)
+        if self.faults:
+            return json_response(self.faults.pop(0), {'detail': 'error'}, url)
+
+        self.urls.append(requests.Request(method, url, params=params).prepare().url)
+        site_codes = {str(site_code) for site_code in params['site_codes']}
+        resources = [
+            value for value in self.values
+            if str(value['site']['siteCode']) in site_codes and value['variable']['variablecode'] in params['variable_codes']
+        ]
+        offset = params['offset'] or 0
+        page = resources[offset:offset + params['page_size']]
+        return json_response(200, {'offset': offset, 'count': len(resources), 'resources': page}, url)
+
+    def close(self):
+        pass
+
+
+class RecordingInstrumentation(Instrumentation):
+    """Records the name of every hook call."""
+
+    def __init__(self):
+        self.hooks = []
+
+    def request(self, *args):
+        self.hooks.append('request')
+
+    def retry(self, *args):
+        self.hooks.append('retry')
+
+    def json_decoded(self, *args):
+        self.hooks.append('json_decoded')
+
+    def pages(self, *args):
+        self.hooks.append('pages')
+
+    def cache(self, *args):
+        self.hooks.append('cache')
+
+    def mapping(self, *args):
+        self.hooks.append('mapping')
+
+
+def make_sdk(transport, **kwargs):
+    return IEasyHydroSDK(host='http://legacy.test', username='user', password='secret', transport=transport, **kwargs)
+
+
+def test_site_codes_are_chunked_below_the_url_limit():
+    site_codes = [str(15000 + index) for index in range(200)]
+    transport = LegacyDataValuesTransport(site_codes, ['0005'])
+    sdk = make_sdk(transport)
+
+    data = sdk.get_data_values_for_sites(site_codes, ['discharge_daily'], max_url_length=500)
+
+    requested = [parse_qs(urlsplit(url).query)['site_codes'] for url in transport.urls]
+    assert len(requested) > 1
+    assert [site_code for chunk in requested for site_code in chunk] == site_codes
+    assert all(len(url) <= 500 for url in transport.urls)
+    assert all(data[site_code]['discharge_daily']['data_values'] for site_code in site_codes)
+
+
+def test_one_request_when_the_sites_fit_in_one_url():
+    transport = LegacyDataValuesTransport(['15054', '15055'], ['0005'])
+
+    make_sdk(transport).get_data_values_for_sites(['15054', '15055'], ['discharge_daily'])
+
+    assert len(transport.urls) == 1
+
+
+def test_values_are_split_per_site_and_variable():
+    transport = LegacyDataValuesTransport(['15054', '15055'], ['0001', '0005'])
+
+    data = make_sdk(transport).get_data_values_for_sites(
+        ['15054', '15055'], ['water_level_daily', 'discharge_daily']
+    )
+
+    for site_code in ('15054', '15055'):
+        for variable_type, variable_code in (('water_level_daily', '0001'), ('discharge_daily', '0005')):
+            series = data[site_code][variable_type]
+            assert series['site']['site_code'] == site_code
+            assert series['variable']['variable_code'] == variable_code
+            assert [value['data_value'] for value in series['data_values']] == [float(site_code)]
+
+
+def test_sites_without_values_map_to_an_empty_list():
+    transport = LegacyDataValuesTransport(['15054'], ['0005'])
+
+    data = make_sdk(transport).get_data_values_for_sites(['15054', '16000'], ['discharge_daily', 'water_level_daily'])
+
+    assert data['15054']['water_level_daily'] == []
+    assert data['16000'] == {'discharge_daily': [], 'water_level_daily': []}
+
+
+def test_integer_and_string_site_codes_are_matched():
+    transport = LegacyDataValuesTransport(['15054', '15055'], ['0005'])
+
+    data = make_sdk(transport).get_data_values_for_sites([15054, '15055'], ['discharge_daily'])
+
+    assert set(data) == {15054, '15055'}
+    assert data[15054]['discharge_daily']['site']['site_code'] == 15054
+    assert data['15055']['discharge_daily']['data_values'][0]['data_value'] == 15055.0
+
+
+def test_every_instrumentation_hook_is_called(monkeypatch):
+    monkeypatch.setattr(time, 'sleep', lambda seconds: None)
+    site_codes = [str(15000 + index) for index in range(3)]
+    transport = LegacyDataValuesTransport(site_codes, ['0005'])
+    transport.faults = [503]
+    instrumentation = RecordingInstrumentation()
+    sdk = make_sdk(transport, instrumentation=instrumentation, coalesce=True)
+
+    sdk.get_data_values_for_sites(site_codes, ['discharge_daily'])
+
+    assert set(instrumentation.hooks) == {'request', 'retry', 'json_decoded', 'pages', 'cache', 'mapping'}
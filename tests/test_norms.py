@@ -0,0 +1,98 @@
+import math
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from ieasyhydro_sdk.columnar import DataValueColumns
+from ieasyhydro_sdk.norms import compare_to_norm, period_index
+from ieasyhydro_sdk.records import Norm
+
+
+@pytest.mark.parametrize('date, decade, pentad, month', [
+    ('2021-01-01', 0, 0, 0),
+    ('2021-01-05', 0, 0, 0),
+    ('2021-01-06', 0, 1, 0),
+    ('2021-01-10', 0, 1, 0),
+    ('2021-01-11', 1, 2, 0),
+    ('2021-01-20', 1, 3, 0),
+    ('2021-01-21', 2, 4, 0),
+    ('2021-01-26', 2, 5, 0),
+    ('2021-01-31', 2, 5, 0),
+    # the last decade and pentad of February end with the month, in leap years too
+    ('2021-02-21', 5, 10, 1),
+    ('2021-02-26', 5, 11, 1),
+    ('2021-02-28', 5, 11, 1),
+    ('2020-02-28', 5, 11, 1),
+    ('2020-02-29', 5, 11, 1),
+    ('2020-03-01', 6, 12, 2),
+    ('2021-12-31', 35, 71, 11),
+])
+def test_period_index(date, decade, pentad, month):
+    dates = np.array([f'{date}T23:59:59'], dtype='datetime64[s]')
+
+    assert period_index(dates, 'd').tolist() == [decade]
+    assert period_index(dates, 'p').tolist() == [pentad]
+    assert period_index(dates, 'm').tolist() == [month]
+
+
+def test_invalid_norm_period():
+    with pytest.raises(ValueError, match="Invalid norm period 'w'"):
+        period_index(['2021-01-01'], 'w')
+
+
+def test_values_are_compared_to_the_norm_of_their_local_period():
+    norm = [float(index + 1) for index in range(36)]
+    # UTC is still in the first decade, the local (UTC+6) timestamp already in the second
+    series = DataValueColumns(
+        site=None,
+        variable=None,
+        local_date_time=np.array(['2021-01-11T02:00:00', '2021-01-21T00:00:00'], dtype='datetime64[s]'),
+        utc_date_time=np.array(['2021-01-10T20:00:00', '2021-01-20T18:00:00'], dtype='datetime64[s]'),
+        data_value=np.array([4.0, 6.0]),
+    )
+
+    comparison = compare_to_norm(series, norm, 'd')
+
+    assert comparison.period_index.tolist() == [1, 2]
+    assert comparison.norm.tolist() == [2.0, 3.0]
+    assert comparison.anomaly.tolist() == [2.0, 3.0]
+    assert comparison.ratio.tolist() == [2.0, 2.0]
+
+
+@pytest.mark.parametrize('norm_slot, value, anomaly, ratio', [
+    (4.0, 2.0, -2.0, 0.5),
+    (None, 2.0, math.nan, math.nan),
+    (math.nan, 2.0, math.nan, math.nan),
+    (0.0, 2.0, 2.0, math.nan),
+    (4.0, math.nan, math.nan, math.nan),
+])
+def test_missing_norms_and_values(norm_slot, value, anomaly, ratio):
+    norm = [norm_slot] * 12
+
+    comparison = compare_to_norm([value], norm, 'm', dates=['2021-06-15'])
+
+    np.testing.assert_equal(comparison.anomaly, [anomaly])
+    np.testing.assert_equal(comparison.ratio, [ratio])
+
+
+@pytest.mark.parametrize('norm', [
+    [1.0] * 72,
+    Norm(values=[1.0] * 72, start_year=2000, end_year=2020, site_id=7, norm_period='p'),
+    {'norm_data': [1.0] * 72, 'start_year': 2000, 'end_year': 2020, 'site_id': 7},
+])
+def test_norm_shapes(norm):
+    comparison = compare_to_norm([3.0], norm, 'p', dates=['2021-01-06'])
+
+    assert comparison.anomaly.tolist() == [2.0]
+
+
+def test_empty_norm_gives_nan():
+    comparison = compare_to_norm([3.0], [], 'd', dates=['2021-01-06'])
+
+    assert np.isnan(comparison.anomaly).all()
+
+
+def test_norm_length_must_match_the_period():
+    with pytest.raises(ValueError, match='expected 36'):
+        compare_to_norm([3.0], [1.0] * 72, 'd', dates=['2021-01-06'])
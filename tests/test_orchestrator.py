@@ -0,0 +1,84 @@
+import pickle
+
+from ieasyhydro_sdk.orchestrator import SyncOrchestrator, worker_sdk_kwargs
+from ieasyhydro_sdk.transport import ReplayTransport, SessionTransport
+
+
+def worker_settings(sdk, job):
+    return {
+        'transport': type(sdk.transport).__name__,
+        'timeout': sdk.timeout,
+        'max_retries': sdk.max_retries,
+        'max_workers': sdk.max_workers,
+        'rate': sdk.rate_limiter.max_rate,
+        'max_concurrency': sdk.rate_limiter.max_concurrency,
+        'cache': sdk.cache.path if sdk.cache is not None else None,
+        'site_catalog_ttl': sdk.site_catalog.ttl,
+    }
+
+
+def test_workers_copy_the_client_settings(tmp_path, make_sdk):
+    cache = str(tmp_path / 'data_values.sqlite3')
+    sdk = make_sdk(
+        timeout=7, max_retries=1, max_workers=3, rate_limit=10, max_concurrency=5, cache=cache, site_catalog_ttl=60
+    )
+
+    results = SyncOrchestrator(sdk, processes=2, handler=worker_settings).run([{}, {}])
+
+    assert [result['error'] for result in results] == [None, None]
+    assert results[0]['result'] == {
+        'transport': 'SyntheticHFTransport',
+        'timeout': 7,
+        'max_retries': 1,
+        'max_workers': 3,
+        'rate': 5.0,
+        'max_concurrency': 3,
+        'cache': cache,
+        'site_catalog_ttl': 60,
+    }
+
+
+def test_limits_are_split_between_processes(make_sdk):
+    sdk = make_sdk(rate_limit=8, max_concurrency=10)
+
+    sdk_kwargs = worker_sdk_kwargs(sdk, 4)
+    assert sdk_kwargs['rate_limit'] == 2
+    assert sdk_kwargs['max_concurrency'] == 3
+
+    sdk_kwargs = worker_sdk_kwargs(make_sdk(max_concurrency=2), 4)
+    assert sdk_kwargs['rate_limit'] is None
+    assert sdk_kwargs['max_concurrency'] == 1
+
+
+def test_sdk_kwargs_override_copied_settings(make_sdk):
+    orchestrator = SyncOrchestrator(make_sdk(max_workers=3), processes=2, sdk_kwargs={'max_workers': 1})
+    assert orchestrator.sdk_kwargs['max_workers'] == 1
+
+
+def test_jobs_run_with_the_copied_transport(make_sdk):
+    sdk = make_sdk()
+    jobs = [
+        {'filters': {
+            'site_codes': [site_code],
+            'variable_names': ['WDD'],
+            'utc_date_time__gte': '2020-01-01T00:00:00Z',
+            'utc_date_time__lt': '2020-02-01T00:00:00Z',
+        }}
+        for site_code in ('10000', '10001', '10002')
+    ]
+
+    results = SyncOrchestrator(sdk, processes=2).run(jobs)
+
+    assert [result['error'] for result in results] == [None] * 3
+    assert [result['result']['results'][0]['station_code'] for result in results] == ['10000', '10001', '10002']
+    assert all(len(result['result']['results'][0]['data'][0]['values']) == 31 for result in results)
+
+
+def test_transports_can_be_pickled():
+    session_transport = pickle.loads(pickle.dumps(SessionTransport(pool_size=4)))
+    assert session_transport.pool_size == 4
+
+    replay_transport = pickle.loads(pickle.dumps(ReplayTransport({'interactions': [{
+        'method': 'GET', 'path': '/api/v1/x', 'query': [], 'status_code': 200, 'headers': {}, 'body': '[]',
+    }]})))
+    assert replay_transport.request('get', 'http://hf.test/api/v1/x').json() == []
@@ -0,0 +1,54 @@
+import pytest
+
+from ieasyhydro_sdk.records import Norm, Site
+from ieasyhydro_sdk.transport import SyntheticHFTransport
+
+
+def test_norm_to_dict_has_the_legacy_shape():
+    norm = Norm(
+        values=[1.0, None, 3.0], site_code='15194', norm_type='discharge', start_year=2000, end_year=2020, site_id=7,
+    )
+
+    assert norm.to_dict() == {'norm_data': [1.0, None, 3.0], 'start_year': 2000, 'end_year': 2020, 'site_id': 7}
+
+
+def test_norm_to_list_has_the_hf_shape(make_sdk):
+    sdk = make_sdk(SyntheticHFTransport(station_count=1))
+
+    norm = sdk.get_norm_for_site('10000', 'discharge', as_records=True)
+
+    assert norm.to_list() == sdk.get_norm_for_site('10000', 'discharge')
+    assert norm.norm_period == 'd'
+
+
+class NoAssociationsTransport(SyntheticHFTransport):
+    """Synthetic server listing virtual stations without the associations key."""
+
+    @staticmethod
+    def _station(index, station_type):
+        station = SyntheticHFTransport._station(index, station_type)
+        station.pop('associations', None)
+        return station
+
+
+@pytest.mark.parametrize('transport_class', [SyntheticHFTransport, NoAssociationsTransport])
+def test_site_records_match_the_dicts(make_sdk, transport_class):
+    sdk = make_sdk(transport_class(station_count=2, virtual_station_count=1))
+
+    for kind in ('discharge', 'meteo', 'virtual'):
+        sites = getattr(sdk, f'get_{kind}_sites')()
+        records = getattr(sdk, f'get_{kind}_sites')(as_records=True)
+        assert [record.to_dict() for record in records] == sites
+        assert all(isinstance(record, Site) for record in records)
+
+
+def test_site_records_do_not_share_the_cached_sites(make_sdk):
+    sdk = make_sdk(SyntheticHFTransport(station_count=1))
+
+    (record,) = sdk.get_discharge_sites(as_records=True)
+    record.enabled_forecasts['daily_forecast'] = True
+    record.basin.official_name = 'changed'
+
+    (site,) = sdk.get_discharge_sites()
+    assert site['enabled_forecasts']['daily_forecast'] is False
+    assert site['basin']['official_name'] == 'Basin 0'
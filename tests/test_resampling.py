@@ -0,0 +1,100 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from ieasyhydro_sdk.columnar import DataValueColumns
+from ieasyhydro_sdk.resampling import period_start, resample
+
+
+@pytest.mark.parametrize('date, pentad, decade, month', [
+    ('2021-01-01', '2021-01-01', '2021-01-01', '2021-01-01'),
+    ('2021-01-05', '2021-01-01', '2021-01-01', '2021-01-01'),
+    ('2021-01-06', '2021-01-06', '2021-01-01', '2021-01-01'),
+    ('2021-01-10', '2021-01-06', '2021-01-01', '2021-01-01'),
+    ('2021-01-11', '2021-01-11', '2021-01-11', '2021-01-01'),
+    ('2021-01-20', '2021-01-16', '2021-01-11', '2021-01-01'),
+    ('2021-01-21', '2021-01-21', '2021-01-21', '2021-01-01'),
+    ('2021-01-26', '2021-01-26', '2021-01-21', '2021-01-01'),
+    ('2021-01-31', '2021-01-26', '2021-01-21', '2021-01-01'),
+    ('2021-02-28', '2021-02-26', '2021-02-21', '2021-02-01'),
+    ('2020-02-29', '2020-02-26', '2020-02-21', '2020-02-01'),
+    ('2020-03-01', '2020-03-01', '2020-03-01', '2020-03-01'),
+])
+def test_period_start(date, pentad, decade, month):
+    dates = np.array([f'{date}T23:59:59'], dtype='datetime64[s]')
+
+    assert str(period_start(dates, 'daily')[0]) == date
+    assert str(period_start(dates, 'pentad')[0]) == pentad
+    assert str(period_start(dates, 'decade')[0]) == decade
+    assert str(period_start(dates, 'month')[0]) == month
+
+
+def test_invalid_period():
+    with pytest.raises(ValueError, match="Invalid period 'week'"):
+        period_start(['2021-01-01'], 'week')
+
+
+def make_series(local_date_times, values, utc_offset_hours=6):
+    local_date_time = np.array(local_date_times, dtype='datetime64[s]')
+    return DataValueColumns(
+        site={'site_code': '10000'},
+        variable={'variable_code': 'WDD'},
+        local_date_time=local_date_time,
+        utc_date_time=local_date_time - np.timedelta64(utc_offset_hours, 'h'),
+        data_value=np.array(values, dtype=np.float64),
+    )
+
+
+SERIES = make_series(
+    ['2021-01-09T08:00:00', '2021-01-10T20:00:00', '2021-01-11T02:00:00', '2021-01-15T08:00:00',
+     '2021-01-20T08:00:00', '2021-01-31T08:00:00'],
+    [1.0, 3.0, 10.0, float('nan'), 20.0, 5.0],
+)
+
+
+@pytest.mark.parametrize('how, expected', [
+    ('mean', [2.0, 15.0, 5.0]),
+    ('sum', [4.0, 30.0, 5.0]),
+    ('min', [1.0, 10.0, 5.0]),
+    ('max', [3.0, 20.0, 5.0]),
+    ('count', [2.0, 2.0, 1.0]),
+])
+def test_decade_aggregations(how, expected):
+    resampled = resample(SERIES, 'decade', how)
+
+    assert resampled.data_value.tolist() == expected
+    assert resampled.variable == {'variable_code': 'WDD', 'resampled': {'period': 'decade', 'how': how}}
+    assert resampled.site == {'site_code': '10000'}
+
+
+def test_resampled_timestamps_are_the_local_period_starts():
+    resampled = resample(SERIES, 'decade')
+
+    assert resampled.local_date_time.astype(str).tolist() == [
+        '2021-01-01T00:00:00', '2021-01-11T00:00:00', '2021-01-21T00:00:00'
+    ]
+    # shifted by the UTC offset of the values, a local period starts on the previous UTC day
+    assert resampled.utc_date_time.astype(str).tolist() == [
+        '2020-12-31T18:00:00', '2021-01-10T18:00:00', '2021-01-20T18:00:00'
+    ]
+
+
+def test_periods_without_values_are_left_out():
+    resampled = resample(SERIES, 'daily', 'count')
+
+    assert resampled.local_date_time.astype(str).tolist() == [
+        '2021-01-09T00:00:00', '2021-01-10T00:00:00', '2021-01-11T00:00:00', '2021-01-20T00:00:00',
+        '2021-01-31T00:00:00',
+    ]
+
+
+def test_leap_february_is_one_pentad_and_one_month():
+    series = make_series(['2020-02-26T12:00:00', '2020-02-29T12:00:00', '2020-03-01T12:00:00'], [1.0, 2.0, 4.0])
+
+    assert resample(series, 'pentad', 'sum').data_value.tolist() == [3.0, 4.0]
+    assert resample(series, 'month', 'sum').data_value.tolist() == [3.0, 4.0]
+
+
+def test_invalid_aggregation():
+    with pytest.raises(ValueError, match="Invalid aggregation 'median'"):
+        resample(SERIES, 'daily', 'median')
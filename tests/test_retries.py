@@ -0,0 +1,124 @@
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+import pytest
+
+from ieasyhydro_sdk.throttling import backoff_delay, parse_retry_after
+from ieasyhydro_sdk.transport import SyntheticHFTransport, json_response
+
+
+class FaultyTransport(SyntheticHFTransport):
+    """Synthetic server answering API requests with the queued faults first.
+
+    A fault is a status code, a (status code, headers) tuple or an exception to raise.
+    """
+
+    def __init__(self, faults, **kwargs):
+        super().__init__(station_count=2, **kwargs)
+        self.faults = list(faults)
+        self.requests = []
+
+    def request(self, method, url, headers=None, json=None, params=None, timeout=None):
+        path = urlsplit(url).path
+        if 'auth/' not in path:
+            self.requests.append((method.upper(), path, time.monotonic()))
+            if self.faults:
+                fault = self.faults.pop(0)
+                if isinstance(fault, Exception):
+                    raise fault
+                status_code, response_headers = fault if isinstance(fault, tuple) else (fault, None)
+                return json_response(status_code, {'detail': 'error'}, url, response_headers)
+        return super().request(method, url, headers=headers, json=json, params=params, timeout=timeout)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(time, 'sleep', delays.append)
+    return delays
+
+
+def test_retries_throttled_and_unavailable_responses(sleeps, make_sdk):
+    transport = FaultyTransport([429, 503])
+    sdk = make_sdk(transport)
+
+    sites = sdk.get_discharge_sites()
+
+    assert len(sites) == 2
+    assert len(transport.requests) == 3
+    assert len(sleeps) == 2
+    # the server asked to slow down twice
+    assert sdk.rate_limiter.concurrency_limit < sdk.rate_limiter.max_concurrency
+
+
+def test_retries_connection_errors(sleeps, make_sdk):
+    transport = FaultyTransport([ConnectionError('reset')])
+    sdk = make_sdk(transport)
+
+    assert len(sdk.get_discharge_sites()) == 2
+    assert len(transport.requests) == 2
+
+
+def test_gives_up_after_max_retries(sleeps, make_sdk):
+    transport = FaultyTransport([503] * 5)
+    sdk = make_sdk(transport, max_retries=2)
+
+    with pytest.raises(ValueError, match='status code 503'):
+        sdk.get_discharge_sites()
+    assert len(transport.requests) == 3
+
+
+def test_honours_retry_after(sleeps, make_sdk):
+    transport = FaultyTransport([(429, {'Retry-After': '0.2'})])
+    sdk = make_sdk(transport)
+
+    assert len(sdk.get_discharge_sites()) == 2
+
+    # the rate limiter held the retry back instead of a backoff sleep
+    assert sleeps == []
+    first, retry = transport.requests
+    assert retry[2] - first[2] >= 0.2
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('3') == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('not a date') is None
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 < parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
+
+
+def test_backoff_is_capped():
+    for attempt in range(30):
+        assert 0 <= backoff_delay(attempt, base=0.5, cap=4.0) <= 4.0
+
+
+def test_backoff_delays_of_retries_are_capped(sleeps, make_sdk):
+    transport = FaultyTransport([500] * 8)
+    sdk = make_sdk(transport, max_retries=8)
+
+    assert len(sdk.get_discharge_sites()) == 2
+    assert len(sleeps) == 8
+    assert all(0 <= delay <= 30.0 for delay in sleeps)
+
+
+def test_does_not_retry_non_idempotent_requests(sleeps, make_sdk):
+    transport = FaultyTransport([503])
+    sdk = make_sdk(transport)
+
+    response = sdk._call_api('post', 'some/resource', json_body={}, paginated_endpoint=False)
+
+    assert response.status_code == 503
+    assert len(transport.requests) == 1
+    assert sleeps == []
+
+
+def test_does_not_retry_non_idempotent_requests_after_connection_errors(sleeps, make_sdk):
+    transport = FaultyTransport([ConnectionError('reset')])
+    sdk = make_sdk(transport)
+
+    with pytest.raises(ConnectionError):
+        sdk._call_api('post', 'some/resource', json_body={}, paginated_endpoint=False)
+    assert len(transport.requests) == 1
@@ -0,0 +1,106 @@
+from ieasyhydro_sdk.sdk import IEasyHydroHFSDK
+from ieasyhydro_sdk.sharding import shard_filters
+from ieasyhydro_sdk.transport import SyntheticHFTransport
+
+
+FILTERS = {
+    'site_codes': ['10000', '10001'],
+    'variable_names': ['WDD'],
+    'utc_date_time__gte': '2020-01-01T00:00:00+00:00',
+    'utc_date_time__lt': '2020-03-01T00:00:00+00:00',
+}
+
+
+def station(station_code, *timestamps, variable_code='WDD'):
+    return {
+        'station_code': station_code,
+        'data': [{
+            'variable_code': variable_code,
+            'unit': 'm',
+            'values': [{'timestamp_utc': timestamp, 'value': 1.0} for timestamp in timestamps],
+        }],
+    }
+
+
+def serve_shards(monkeypatch, sdk, results_by_shard):
+    """Answer the data values requests of each monthly shard of FILTERS with the given results."""
+    shard_starts = [shard['utc_date_time__gte'] for shard in shard_filters(FILTERS, 'month')]
+
+    def _iter_data_values_pages(api_filters, max_in_flight=None):
+        yield results_by_shard[shard_starts.index(api_filters['timestamp__gte'])]
+
+    monkeypatch.setattr(sdk, '_iter_data_values_pages', _iter_data_values_pages)
+
+
+def test_rows_repeated_at_a_shard_boundary_are_dropped(monkeypatch, make_sdk):
+    sdk = make_sdk()
+    serve_shards(monkeypatch, sdk, [
+        [station('10000', '2020-01-31T00:00:00Z', '2020-02-01T00:00:00Z')],
+        [station('10000', '2020-02-01T00:00:00Z', '2020-02-02T00:00:00Z')],
+    ])
+
+    first, second = sdk._iter_shard_results(FILTERS, 'month', max_in_flight=2)
+
+    assert [value['timestamp_utc'] for value in first[0]['data'][0]['values']] == [
+        '2020-01-31T00:00:00Z', '2020-02-01T00:00:00Z'
+    ]
+    assert [value['timestamp_utc'] for value in second[0]['data'][0]['values']] == ['2020-02-02T00:00:00Z']
+
+
+def test_same_timestamp_of_another_series_is_kept(monkeypatch, make_sdk):
+    sdk = make_sdk()
+    serve_shards(monkeypatch, sdk, [
+        [station('10000', '2020-02-01T00:00:00Z')],
+        [station('10001', '2020-02-01T00:00:00Z'), station('10000', '2020-02-01T00:00:00Z', variable_code='WDDA')],
+    ])
+
+    _, second = sdk._iter_shard_results(FILTERS, 'month')
+
+    assert [len(result['data'][0]['values']) for result in second] == [1, 1]
+
+
+def test_stations_of_later_shards_are_merged(monkeypatch, make_sdk):
+    sdk = make_sdk()
+    serve_shards(monkeypatch, sdk, [
+        [station('10000', '2020-01-01T00:00:00Z')],
+        [station('10000', '2020-02-01T00:00:00Z'), station('10001', '2020-02-01T00:00:00Z')],
+    ])
+
+    merged = IEasyHydroHFSDK._merge_shard_results(sdk._iter_shard_results(FILTERS, 'month'))
+
+    assert [result['station_code'] for result in merged] == ['10000', '10001']
+    assert [value['timestamp_utc'] for value in merged[0]['data'][0]['values']] == [
+        '2020-01-01T00:00:00Z', '2020-02-01T00:00:00Z'
+    ]
+    assert [value['timestamp_utc'] for value in merged[1]['data'][0]['values']] == ['2020-02-01T00:00:00Z']
+
+
+def test_variables_of_later_shards_are_merged():
+    merged = IEasyHydroHFSDK._merge_shard_results([
+        [station('10000', '2020-01-01T00:00:00Z')],
+        [station('10000', '2020-02-01T00:00:00Z', variable_code='WDDA')],
+    ])
+
+    assert [variable_data['variable_code'] for variable_data in merged[0]['data']] == ['WDD', 'WDDA']
+
+
+def test_sharded_iteration_is_chronological(make_sdk):
+    sdk = make_sdk(SyntheticHFTransport(station_count=1, page_size=50))
+    filters = {
+        'site_codes': ['10000'],
+        'variable_names': ['WDD'],
+        'utc_date_time__gte': '2020-01-01T00:00:00Z',
+        'utc_date_time__lt': '2020-07-01T00:00:00Z',
+    }
+
+    results = list(sdk.iter_data_values_for_site(filters, shard='month', max_in_flight=4))
+    timestamps = [value['timestamp_utc'] for result in results for value in result['data'][0]['values']]
+
+    assert len(results) == 6
+    assert timestamps == sorted(timestamps)
+    assert len(timestamps) == len(set(timestamps))
+    assert timestamps == [
+        value['timestamp_utc']
+        for result in sdk.iter_data_values_for_site(filters)
+        for value in result['data'][0]['values']
+    ]
@@ -0,0 +1,101 @@
+from urllib.parse import urlsplit
+
+from ieasyhydro_sdk.transport import SyntheticHFTransport
+
+
+class CountingTransport(SyntheticHFTransport):
+    """Synthetic server counting the requests per path."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.paths = []
+
+    def request(self, method, url, headers=None, json=None, params=None, timeout=None):
+        self.paths.append(urlsplit(url).path)
+        return super().request(method, url, headers=headers, json=json, params=params, timeout=timeout)
+
+    def count(self, part):
+        return sum(part in path for path in self.paths)
+
+    def listings(self, kind):
+        return sum(path.endswith(f'/{kind}') for path in self.paths)
+
+
+def test_station_type_fallback_logs_a_warning(caplog, make_sdk):
+    transport = CountingTransport(station_count=2)
+    sdk = make_sdk(transport)
+
+    # synthetic meteo stations are listed without station type
+    with caplog.at_level('WARNING', logger='ieasyhydro_sdk'):
+        site_uuid = sdk._get_site_uuid_for_site_code('10002', 'meteo', station_type='M')
+
+    assert site_uuid == '00000000-0000-0000-0001-000000000002'
+    assert 'No site found with station_type=M' in caplog.text
+
+
+def test_index_shares_the_site_catalog_listing(make_sdk):
+    transport = CountingTransport(station_count=3)
+    sdk = make_sdk(transport)
+
+    sites = sdk.get_discharge_sites()
+    for site in sites:
+        sdk.get_norm_for_site(site['site_code'], 'discharge')
+
+    assert transport.listings('hydrological') == 1
+    assert transport.count('hydrological-norms/') == 3
+
+
+def test_index_follows_new_listings(make_sdk):
+    transport = CountingTransport(station_count=2)
+    sdk = make_sdk(transport)
+    sdk.get_norm_for_site('10000', 'discharge')
+
+    new_station = transport._station(99, 'M')
+    transport.stations['hydrological'].append(new_station)
+    transport._stations_by_uuid[new_station['uuid']] = new_station
+    sdk.invalidate_site_catalog()
+
+    assert sdk._get_site_uuid_for_site_code(new_station['station_code'], 'hydro') == new_station['uuid']
+    # resolved from the rebuilt index, not looked up directly
+    assert transport.listings('hydrological') == 2
+
+
+def test_invalidate_station_index_fetches_the_listing_again(make_sdk):
+    transport = CountingTransport(station_count=2)
+    sdk = make_sdk(transport)
+    sdk.get_discharge_sites()
+
+    sdk.invalidate_station_index('hydro')
+    sdk.get_norm_for_site('10000', 'discharge')
+
+    assert transport.listings('hydrological') == 2
+
+
+def test_cached_sites_can_be_modified(make_sdk):
+    sdk = make_sdk(CountingTransport(station_count=2))
+
+    sites = sdk.get_discharge_sites()
+    sites[0]['site_code'] = 'changed'
+    sites[0]['basin']['official_name'] = 'changed'
+    sites.pop()
+
+    sites = sdk.get_discharge_sites()
+    assert len(sites) == 2
+    assert sites[0]['site_code'] == '10000'
+    assert sites[0]['basin']['official_name'] == 'Basin 0'
+
+
+def test_norms_survive_a_failed_index_warm_up(make_sdk):
+    class FailingListingTransport(CountingTransport):
+        def request(self, method, url, headers=None, json=None, params=None, timeout=None):
+            if urlsplit(url).path.endswith('/hydrological') and not self.listings('hydrological'):
+                self.paths.append(urlsplit(url).path)
+                raise RuntimeError('listing failed')
+            return super().request(method, url, headers=headers, json=json, params=params, timeout=timeout)
+
+    sdk = make_sdk(FailingListingTransport(station_count=1), max_retries=0)
+
+    norms = sdk.get_norms_for_sites(['10000'], ['discharge'])
+
+    assert norms['10000']['discharge']['error'] is None
+    assert norms['10000']['discharge']['norm_data']
@@ -0,0 +1,138 @@
+import asyncio
+import json
+
+import pytest
+
+from ieasyhydro_sdk.cache import to_timestamp
+from ieasyhydro_sdk.watcher import DataValuesWatcher
+
+
+SINCE = '2020-01-01T00:00:00+00:00'
+
+
+def hour(index):
+    return f'2020-01-01T{index:02d}:00:00+00:00'
+
+
+class GrowingSDK:
+    """Stands in for `IEasyHydroHFSDK.iter_data_values_for_site` on a series store that can grow.
+
+    Values are (station code, variable code, timestamp) triples, the filters of every request
+    are recorded.
+    """
+
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.requests = []
+
+    def add(self, *values):
+        self.values += values
+
+    def iter_data_values_for_site(self, filters):
+        self.requests.append(filters)
+        after = to_timestamp(filters['utc_date_time__gt'])
+        for site_code in filters['site_codes']:
+            data = []
+            for variable_name in filters['variable_names']:
+                values = [
+                    {'timestamp_utc': timestamp, 'value': 1.0}
+                    for station_code, variable_code, timestamp in self.values
+                    if (station_code, variable_code) == (site_code, variable_name) and to_timestamp(timestamp) > after
+                ]
+                if values:
+                    data.append({'variable_code': variable_name, 'unit': 'm', 'values': values})
+            if data:
+                yield {'station_code': site_code, 'data': data}
+
+
+def delivered(rows):
+    return [(row['site_code'], row['variable_code'], row['timestamp_utc']) for row in rows]
+
+
+def test_marks_advance_after_the_callback_returned(tmp_path):
+    checkpoint = tmp_path / 'checkpoint.json'
+    sdk = GrowingSDK([('10000', 'WDD', hour(1)), ('10000', 'WDD', hour(2))])
+    watcher = DataValuesWatcher(sdk, ['10000'], ['WDD'], checkpoint=checkpoint, since=SINCE, interval=0)
+    seen = []
+
+    def callback(rows):
+        seen.append((delivered(rows), dict(watcher.high_water_marks), checkpoint.exists()))
+
+    watcher.watch(callback, max_polls=1)
+
+    assert seen == [([('10000', 'WDD', hour(1)), ('10000', 'WDD', hour(2))], {}, False)]
+    assert watcher.high_water_marks == {'10000|WDD': to_timestamp(hour(2))}
+    assert json.loads(checkpoint.read_text()) == watcher.high_water_marks
+
+
+def test_marks_do_not_advance_when_the_callback_raises(tmp_path):
+    checkpoint = tmp_path / 'checkpoint.json'
+    sdk = GrowingSDK([('10000', 'WDD', hour(1))])
+    watcher = DataValuesWatcher(sdk, ['10000'], ['WDD'], checkpoint=checkpoint, since=SINCE, interval=0)
+
+    def callback(rows):
+        raise RuntimeError('downstream is unavailable')
+
+    with pytest.raises(RuntimeError):
+        watcher.watch(callback, max_polls=1)
+
+    assert watcher.high_water_marks == {}
+    assert not checkpoint.exists()
+    assert delivered(watcher.poll_once()) == [('10000', 'WDD', hour(1))]
+
+
+def test_a_restarted_watcher_continues_from_the_checkpoint(tmp_path):
+    checkpoint = tmp_path / 'checkpoint.json'
+    sdk = GrowingSDK([('10000', 'WDD', hour(1)), ('10001', 'WDD', hour(1))])
+    DataValuesWatcher(sdk, ['10000', '10001'], ['WDD'], checkpoint=checkpoint, since=SINCE).poll_once()
+
+    sdk.add(('10001', 'WDD', hour(2)))
+    restarted = DataValuesWatcher(sdk, ['10000', '10001'], ['WDD'], checkpoint=checkpoint, since=SINCE)
+
+    assert delivered(restarted.poll_once()) == [('10001', 'WDD', hour(2))]
+    assert restarted.poll_once() == []
+    assert sdk.requests[-1]['utc_date_time__gt'] == hour(1)
+
+
+def test_a_batch_starts_at_its_oldest_mark_and_filters_per_series():
+    sdk = GrowingSDK([('10000', 'WDD', hour(index)) for index in range(1, 5)] + [('10001', 'WDD', hour(1))])
+    watcher = DataValuesWatcher(sdk, ['10000', '10001'], ['WDD'], since=SINCE, batch_size=2)
+    watcher.poll_once()
+
+    sdk.add(('10000', 'WDD', hour(5)), ('10001', 'WDD', hour(2)), ('10001', 'WDD', hour(3)))
+    rows = watcher.poll_once()
+
+    assert sdk.requests[-1]['utc_date_time__gt'] == hour(1)
+    assert sdk.requests[-1]['site_codes'] == ['10000', '10001']
+    assert delivered(rows) == [('10000', 'WDD', hour(5)), ('10001', 'WDD', hour(2)), ('10001', 'WDD', hour(3))]
+    assert watcher.high_water_marks == {'10000|WDD': to_timestamp(hour(5)), '10001|WDD': to_timestamp(hour(3))}
+
+
+def test_stations_are_requested_in_batches():
+    sdk = GrowingSDK()
+    watcher = DataValuesWatcher(sdk, ['10000', '10001', '10002'], ['WDD'], since=SINCE, batch_size=2)
+
+    watcher.poll_once()
+
+    assert [request['site_codes'] for request in sdk.requests] == [['10000', '10001'], ['10002']]
+
+
+def test_async_iteration_advances_the_marks_when_resumed():
+    sdk = GrowingSDK([('10000', 'WDD', hour(1))])
+    watcher = DataValuesWatcher(sdk, ['10000'], ['WDD'], since=SINCE, interval=0)
+
+    async def main():
+        batches = []
+        async for rows in watcher:
+            batches.append((delivered(rows), dict(watcher.high_water_marks)))
+            if len(batches) == 1:
+                sdk.add(('10000', 'WDD', hour(2)))
+            else:
+                watcher.stop()
+        return batches
+
+    assert asyncio.run(main()) == [
+        ([('10000', 'WDD', hour(1))], {}),
+        ([('10000', 'WDD', hour(2))], {'10000|WDD': to_timestamp(hour(1))}),
+    ]
+    assert watcher.high_water_marks == {'10000|WDD': to_timestamp(hour(2))}